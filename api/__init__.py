@@ -0,0 +1,6 @@
+# api/__init__.py
+from flask import Blueprint
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+from api import routes  # noqa: E402,F401  (registers the endpoints on api_bp)
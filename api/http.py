@@ -0,0 +1,38 @@
+# api/http.py
+import hashlib
+import json
+from datetime import date, datetime
+
+from flask import Response, request, jsonify
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def json_response(payload, last_modified=None, max_age=0):
+    """
+    Compact JSON with a strong ETag (hash of the body) and optional
+    Last-Modified; answers 304 when If-None-Match / If-Modified-Since match.
+    """
+    body = dumps(payload).encode("utf-8")
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    resp.cache_control.private = True
+    resp.cache_control.max_age = max_age
+    resp.cache_control.must_revalidate = True
+    return resp.make_conditional(request)
+
+
+def error(message, status):
+    resp = jsonify({"error": message})
+    resp.status_code = status
+    return resp
@@ -0,0 +1,139 @@
+# api/routes.py
+from functools import wraps
+
+from flask import request, session
+
+from api import api_bp
+from api.http import json_response, error
+from models import SavedRecipe, MealPlan
+from services.corpus import corpus
+from services.recipe_model import hit_card
+from services.recipes import SOURCES, find_by_ingredients, get_recipe
+from services.nutrition_rollup import plan_entries, plan_rollup
+
+MAX_SEARCH_RESULTS = 50
+
+
+def login_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if "user_id" not in session:
+            return error("login required", 401)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _detail(recipe):
+    return {
+        "id":             recipe.id,
+        "source":         recipe.source,
+        "title":          recipe.title,
+        "image":          recipe.image,
+        "readyInMinutes": recipe.ready_in_minutes,
+        "servings":       recipe.servings,
+        "sourceUrl":      recipe.source_url,
+        "diets":          list(recipe.diets),
+        "ingredients":    [i._asdict() for i in recipe.ingredients],
+        "steps":          list(recipe.steps),
+        "nutrients": [
+            {"name": n.name, "amount": n.amount, "unit": n.unit,
+             "percentOfDailyNeeds": n.percent_of_daily_needs}
+            for n in recipe.nutrients
+        ],
+    }
+
+
+@api_bp.route("/search")
+def search():
+    """?ingredients=a,b searches by ingredient; ?q=text searches titles and summaries of known recipes."""
+    ingredients = [i.strip() for i in request.args.get("ingredients", "").split(",") if i.strip()]
+    query = request.args.get("q", "").strip()
+    if not ingredients and not query:
+        return error("ingredients or q is required", 400)
+    number = min(request.args.get("number", 20, type=int), MAX_SEARCH_RESULTS)
+    if ingredients:
+        results = find_by_ingredients(ingredients, number=number)
+    else:
+        # local corpus only: never waits on an upstream call
+        results = corpus.search_text(query, number)
+    return json_response({"results": [hit_card(r) for r in results]}, max_age=60)
+
+
+@api_bp.route("/recipes/<int:recipe_id>")
+def recipe(recipe_id):
+    """A bare id is a Spoonacular one; search cards carry the source for the route below."""
+    return source_recipe("spoonacular", recipe_id)
+
+
+@api_bp.route("/recipes/<string:source>/<int:recipe_id>")
+def source_recipe(source, recipe_id):
+    if source not in SOURCES:
+        return error("unknown source", 404)
+    recipe = get_recipe(recipe_id, source)
+    if recipe is None:
+        return error("recipe not found", 404)
+    return json_response(_detail(recipe), max_age=300)
+
+
+@api_bp.route("/favorites")
+@login_required
+def favorites():
+    rows = SavedRecipe.query.filter_by(
+        user_id=session["user_id"]
+    ).order_by(SavedRecipe.saved_at.desc()).all()
+    items = [
+        {
+            "id":             e.recipe_id,
+            "source":         e.api_source,
+            "title":          e.title,
+            "image":          e.image,
+            "readyInMinutes": e.ready_in_minutes,
+            "servings":       e.servings,
+            "diets":          e.diets or [],
+            "savedAt":        e.saved_at,
+        }
+        for e in rows
+    ]
+    # ETag only: no timestamp in the rows changes when a favorite is removed,
+    # so a Last-Modified built from them would answer 304 with stale lists
+    return json_response({"favorites": items})
+
+
+@api_bp.route("/mealplans")
+@login_required
+def mealplans():
+    plans = MealPlan.query.filter_by(
+        user_id=session["user_id"]
+    ).order_by(MealPlan.created_at.desc()).all()
+    items = [{"id": p.id, "name": p.name, "createdAt": p.created_at} for p in plans]
+    # ETag only, for the same reason as favorites: deleting a plan moves no timestamp
+    return json_response({"mealplans": items})
+
+
+@api_bp.route("/mealplans/<int:plan_id>")
+@login_required
+def mealplan(plan_id):
+    plan = MealPlan.query.filter_by(id=plan_id, user_id=session["user_id"]).first()
+    if plan is None:
+        return error("meal plan not found", 404)
+    return json_response(
+        {"id": plan.id, "name": plan.name, "createdAt": plan.created_at, "data": plan.data},
+        last_modified=plan.created_at
+    )
+
+
+@api_bp.route("/mealplans/<int:plan_id>/nutrition")
+@login_required
+def mealplan_nutrition(plan_id):
+    """Per-day and per-week totals; targets can be overridden, e.g. ?calories=2200&protein=60."""
+    plan = MealPlan.query.filter_by(id=plan_id, user_id=session["user_id"]).first()
+    if plan is None:
+        return error("meal plan not found", 404)
+    targets = {}
+    for key, value in request.args.items():
+        try:
+            targets[key] = float(value)
+        except ValueError:
+            return error(f"target {key} must be a number", 400)
+    rollup = plan_rollup(plan_entries(plan.data), targets)
+    return json_response({"id": plan.id, **rollup.to_dict()})
@@ -1,17 +1,23 @@
 import os
-from datetime import datetime, timedelta
+import logging
 
+import json
 from flask import (
     Flask, render_template, request,
-    redirect, url_for, session
+    redirect, url_for, session, g,
+    Response, stream_with_context
 )
 from services.email_service import send_email
 from dotenv import load_dotenv
 from itsdangerous import URLSafeTimedSerializer
 
-# 1) Load environment vars
+# 1) Load environment vars, then start the log pipeline (see services/logs.py)
 load_dotenv()
 
+from services.logs import setup_logging
+setup_logging()
+log = logging.getLogger(__name__)
+
 # 2) Create Flask app
 app = Flask(
     __name__,
@@ -20,9 +26,11 @@ app = Flask(
 )
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "change-this-in-prod")
 
-# Debug: Print and echo the database URI
-app.config['SQLALCHEMY_ECHO'] = True
-print(f"🗄️  DATABASE_URI: {os.getenv('DATABASE_URL')}")
+# SQL statements are logged through the queue rather than SQLAlchemy's own
+# stdout handler: SQLALCHEMY_ECHO=1 (or LOG_LEVELS=sqlalchemy.engine=INFO)
+app.config['SQLALCHEMY_ECHO'] = False
+if os.getenv("SQLALCHEMY_ECHO", "0") == "1":
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
 # 3) Configure Mail
 app.config.update(
@@ -38,12 +46,17 @@ app.config.update(
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-from models import db, User, SavedRecipe, MealPlan
+from models import db, User, SavedRecipe, MealPlan, upgrade_schema
 
 db.init_app(app)
 with app.app_context():
+    log.info("Database: %s", db.engine.url.render_as_string(hide_password=True))
     db.create_all()
+    upgrade_schema()
 
+# 4b) Request timing, upstream/DB accounting and /metrics
+from services import metrics
+metrics.init_app(app, db)
 
 # 5) Serializer for password resets
 serializer = URLSafeTimedSerializer(app.secret_key)
@@ -52,13 +65,21 @@ serializer = URLSafeTimedSerializer(app.secret_key)
 from auth import auth_bp
 app.register_blueprint(auth_bp)
 
+# 6b) Register the JSON API (/api/v1)
+from api import api_bp
+app.register_blueprint(api_bp)
+
 # 7) Import recipe services
 from services.search import (
-    get_random_recipes,
     find_by_ingredients,
-    get_recipe_info,
-    matches_diet
+    stream_by_ingredients,
+    get_recipe,
+    matches_diet,
+    SOURCES
 )
+from services.recipe_model import hit_card
+from services.snapshots import card_snapshot, start_snapshot_refresher
+start_snapshot_refresher(app)
 
 # —— LANGUAGE SUPPORT —— #
 
@@ -78,38 +99,43 @@ def set_language(lang):
         session['language'] = lang
     return redirect(request.referrer or url_for('index'))
 
-# 9) Instantiate Translator
-from utils.translator import Translator
-translator = Translator()  # defaults to ./lang/{code}.json
+# 9) Preload every language once; per-request lookups never touch the disk
+from utils.translator import TranslationCatalog
+catalog = TranslationCatalog(
+    LANGUAGES,
+    hot_reload=os.getenv("TRANSLATIONS_HOT_RELOAD", "0") == "1"
+)
 
-# 10) Load per-request language
+def _(key):
+    translations = g.get("translations") or catalog.get("en")
+    return translations.get(key, key)
+
+# 10) Pick the per-request language
 @app.before_request
 def _load_language():
+    if catalog.hot_reload:
+        catalog.reload_changed()
     lang = session.get("language", "en")
-    translator.load_language(lang)
+    g.language = lang if lang in LANGUAGES else "en"
+    g.translations = catalog.get(g.language)
 
 # 11) Inject helpers into templates
 @app.context_processor
 def _inject_globals():
     return {
-        "_": translator._,        # translation func
+        "_": _,                   # translation func
         "LANGUAGES": LANGUAGES,   # for your navbar dropdown
-        "current_language": session.get("language", "en"),
+        "current_language": g.get("language", "en"),
     }
 
-# —— Homepage cache —— #
-_cached_recipes = []
-_cached_time    = None
-CACHE_DURATION  = timedelta(hours=6)
+# —— Homepage —— #
+from services.homepage import get_homepage_recipes, start_homepage_warmer
+start_homepage_warmer()
 
 @app.route("/")
 def index():
-    global _cached_recipes, _cached_time
-    now = datetime.utcnow()
-    if _cached_time is None or now - _cached_time > CACHE_DURATION:
-        _cached_recipes = get_random_recipes(number=8)
-        _cached_time    = now
-    return render_template("index.html", recipes=_cached_recipes)
+    recipes = get_homepage_recipes(session.get("user_id"), g.language, number=8)
+    return render_template("index.html", recipes=recipes)
 
 @app.route("/search", methods=["GET", "POST"])
 def search():
@@ -127,30 +153,42 @@ def search():
     )
 
 
-@app.route("/external/<int:recipe_id>")
-def view_external(recipe_id):
-    info = get_recipe_info(recipe_id)
-    if not info:
-        return render_template("error.html", message=_("error_default")), 404
+@app.route("/search/stream")
+def search_stream():
+    """Server-Sent Events: one `results` event per source as it answers, then `done`."""
+    ingredients = request.args.get("ingredients", "")
+    ing_list = [i.strip() for i in ingredients.split(",") if i.strip()]
+
+    def card(r):
+        card = hit_card(r)
+        rid = card["id"]
+        card["url"] = url_for("view_external", source=card["source"], recipe_id=rid) if str(rid).isdigit() else ""
+        return card
+
+    def events():
+        if ing_list:
+            for source, results in stream_by_ingredients(ing_list, number=20):
+                payload = {"source": source, "results": [card(r) for r in results]}
+                yield f"event: results\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    recipe = {
-        "title":          info.get("title") or info.get("name", ""),
-        "image":          info.get("image", ""),
-        "ingredients":    "\n".join(
-                              f"{i.get('amount','')} {i.get('unit','')} {i.get('name','')}".strip()
-                              for i in info.get("extendedIngredients", [])
-                          ),
-        "instructions":   "\n".join(
-                              step.get("step","")
-                              for block in info.get("analyzedInstructions", [])
-                              for step in block.get("steps", [])
-                          ) or info.get("strInstructions",""),
-        "readyInMinutes": info.get("readyInMinutes", 0),
-        "servings":       info.get("servings", 1),
-        "sourceUrl":      info.get("sourceUrl") or info.get("strSource","")
-    }
 
-    source = "spoonacular"
+# the bare /external/<id> form predates TheMealDB details and means Spoonacular
+@app.route("/external/<int:recipe_id>", defaults={"source": "spoonacular"})
+@app.route("/external/<string:source>/<int:recipe_id>")
+def view_external(source, recipe_id):
+    if source not in SOURCES:
+        return render_template("error.html", message=_("error_default")), 404
+    recipe = get_recipe(recipe_id, source)
+    if recipe is None:
+        return render_template("error.html", message=_("error_default")), 404
+
     is_saved = False
     if 'user_id' in session:
         is_saved = bool(
@@ -173,23 +211,11 @@ def view_external(recipe_id):
 def save_recipe(source, recipe_id):
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
-    info = get_recipe_info(recipe_id)
-    if not info:
+    recipe = get_recipe(recipe_id, source)
+    if recipe is None:
         return render_template("error.html", message=_("error_default")), 400
-    exists = SavedRecipe.query.filter_by(
-        user_id=session['user_id'],
-        api_source=source,
-        recipe_id=recipe_id
-    ).first()
-    if not exists:
-        sr = SavedRecipe(
-            user_id=session['user_id'],
-            api_source=source,
-            recipe_id=recipe_id,
-            title=info.get("title") or info.get("name","")
-        )
-        db.session.add(sr)
-        db.session.commit()
+    SavedRecipe.upsert(session['user_id'], source, recipe_id, card_snapshot(recipe))
+    db.session.commit()
     return redirect(request.referrer or url_for('index'))
 
 @app.route("/unsave/<string:source>/<int:recipe_id>", methods=["POST"])
@@ -214,17 +240,20 @@ def favorites():
         user_id=session['user_id']
     ).order_by(SavedRecipe.saved_at.desc()).all()
 
-    recipes = []
-    for e in saved_entries:
-        info = get_recipe_info(e.recipe_id)
-        if not info:
-            continue
-        recipes.append({
-            "id":       e.recipe_id,
-            "title":    info.get("title") or info.get("name", ""),
-            "image":    info.get("image",""),
-            "saved_at": e.saved_at,
-        })
+    # Cards render from the stored snapshot; stale ones are refreshed in the background
+    recipes = [
+        {
+            "id":             e.recipe_id,
+            "source":         e.api_source,
+            "title":          e.title,
+            "image":          e.image or "",
+            "readyInMinutes": e.ready_in_minutes,
+            "servings":       e.servings,
+            "diets":          e.diets or [],
+            "saved_at":       e.saved_at,
+        }
+        for e in saved_entries
+    ]
 
     return render_template("favorites.html", recipes=recipes)
 
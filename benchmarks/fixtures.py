@@ -0,0 +1,160 @@
+# benchmarks/fixtures.py
+"""
+Deterministic upstream responses for the benchmarks, written in the same
+format HTTP_MODE=record produces. Point --fixtures at a directory of real
+recordings to benchmark against those instead.
+"""
+import json
+import random
+
+import requests
+
+from services.fixtures import FixtureStore
+
+SPOONACULAR = "https://api.spoonacular.com"
+MEALDB = "https://www.themealdb.com/api/json/v1/1"
+
+RECIPE_COUNT = 120
+RECIPE_ID_BASE = 600000
+
+QUERIES = [
+    ["chicken", "rice", "garlic"],
+    ["beef", "onion", "tomato"],
+    ["pasta", "parmesan", "basil"],
+    ["eggs", "flour", "milk"],
+    ["salmon", "lemon", "dill"],
+]
+SEARCH_NUMBER = 10
+
+_INGREDIENTS = [
+    ("chicken breast", "lb"), ("white rice", "cups"), ("garlic clove", ""), ("ground beef", "lb"),
+    ("yellow onion", ""), ("diced tomatoes", "oz"), ("spaghetti", "oz"), ("parmesan cheese", "cup"),
+    ("fresh basil", "tbsp"), ("eggs", ""), ("all-purpose flour", "cups"), ("whole milk", "cup"),
+    ("salmon fillet", "oz"), ("lemon juice", "tbsp"), ("fresh dill", "tsp"), ("olive oil", "tbsp"),
+    ("unsalted butter", "tbsp"), ("kosher salt", "tsp"), ("black pepper", "tsp"), ("soy sauce", "tbsp"),
+    ("brown sugar", "cup"), ("heavy cream", "cup"), ("green onions", ""), ("red bell pepper", ""),
+    ("shiitake mushrooms", "oz"), ("chicken broth", "cups"), ("ginger", "tbsp"), ("carrots", ""),
+]
+_NUTRIENTS = [
+    ("Calories", "kcal"), ("Fat", "g"), ("Saturated Fat", "g"), ("Carbohydrates", "g"),
+    ("Net Carbohydrates", "g"), ("Sugar", "g"), ("Cholesterol", "mg"), ("Sodium", "mg"),
+    ("Protein", "g"), ("Vitamin C", "mg"), ("Selenium", "µg"), ("Phosphorus", "mg"),
+    ("Vitamin B6", "mg"), ("Iron", "mg"), ("Potassium", "mg"), ("Fiber", "g"),
+    ("Magnesium", "mg"), ("Vitamin B3", "mg"), ("Zinc", "mg"), ("Calcium", "mg"),
+    ("Vitamin A", "IU"), ("Folate", "µg"), ("Vitamin E", "mg"), ("Vitamin K", "µg"),
+]
+_TOOLS = ["oven", "skillet", "saucepan", "whisk", "baking sheet", "pot", "knife", "bowl"]
+_AMOUNTS = [0.25, 0.5, 0.75, 1, 1.5, 2, 3, 4, 8, 12, 16]
+
+
+def _nutrients(rng):
+    return [
+        {"name": name, "amount": round(rng.uniform(0.5, 900), 2), "unit": unit,
+         "percentOfDailyNeeds": round(rng.uniform(1, 80), 2)}
+        for name, unit in _NUTRIENTS
+    ]
+
+
+def recipe_info(recipe_id):
+    """A /recipes/{id}/information?includeNutrition=true body, sized like a real one."""
+    rng = random.Random(recipe_id)
+    picked = rng.sample(_INGREDIENTS, 10)
+    ingredients = []
+    for name, unit in picked:
+        amount = rng.choice(_AMOUNTS)
+        ingredients.append({
+            "id": rng.randint(1000, 99999), "name": name, "amount": amount, "unit": unit,
+            "original": f"{amount:g} {unit} {name}".replace("  ", " "),
+            "measures": {"us": {"amount": amount, "unitShort": unit, "unitLong": unit}},
+        })
+    steps = [
+        {
+            "number": n,
+            "step": f"Use the {rng.choice(_TOOLS)} to combine the {picked[n % 10][0]} "
+                    f"and {picked[(n + 3) % 10][0]}; cook for {rng.randint(2, 25)} minutes.",
+            "ingredients": [{"id": 1, "name": picked[n % 10][0]}],
+            "equipment": [{"id": 2, "name": rng.choice(_TOOLS)}],
+        }
+        for n in range(1, 9)
+    ]
+    return {
+        "id": recipe_id,
+        "title": f"{picked[0][0].title()} with {picked[1][0].title()} #{recipe_id}",
+        "image": f"https://img.spoonacular.com/recipes/{recipe_id}-556x370.jpg",
+        "readyInMinutes": rng.choice([15, 20, 30, 45, 60, 90]),
+        "servings": rng.choice([1, 2, 4, 6]),
+        "sourceUrl": f"https://example.com/recipes/{recipe_id}",
+        "vegetarian": rng.random() < 0.3, "vegan": rng.random() < 0.1,
+        "glutenFree": rng.random() < 0.3, "dairyFree": rng.random() < 0.3,
+        "diets": rng.sample(["gluten free", "dairy free", "paleolithic", "pescatarian", "primal"], 2),
+        "summary": "<b>Tasty</b> and simple. " * 20,
+        "extendedIngredients": ingredients,
+        "analyzedInstructions": [{"name": "", "steps": steps}],
+        "nutrition": {
+            "nutrients": _nutrients(rng),
+            "caloricBreakdown": {"percentProtein": 20.5, "percentFat": 40.1, "percentCarbs": 39.4},
+            "weightPerServing": {"amount": rng.randint(150, 600), "unit": "g"},
+            # per-ingredient breakdowns make the real payloads large
+            "ingredients": [
+                {"name": i["name"], "amount": i["amount"], "unit": i["unit"], "nutrients": _nutrients(rng)[:8]}
+                for i in ingredients
+            ],
+        },
+    }
+
+
+def recipe_ids():
+    return [RECIPE_ID_BASE + i for i in range(RECIPE_COUNT)]
+
+
+def _response(payload):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers["Content-Type"] = "application/json"
+    resp._content = json.dumps(payload).encode("utf-8")
+    return resp
+
+
+def build(root):
+    """Write every fixture the benchmarks replay into `root`. Returns the store."""
+    from services.normalizer import normalize
+
+    store = FixtureStore(root)
+    ids = recipe_ids()
+    for rid in ids:
+        store.save("GET", f"{SPOONACULAR}/recipes/{rid}/information",
+                   {"includeNutrition": True, "includeIngredients": True}, _response(recipe_info(rid)))
+
+    rng = random.Random(7)
+    for query in QUERIES:
+        hits = []
+        for rid in rng.sample(ids, SEARCH_NUMBER):
+            used = rng.randint(1, len(query))
+            hits.append({
+                "id": rid, "title": recipe_info(rid)["title"], "image": f"{rid}.jpg",
+                "usedIngredientCount": used, "missedIngredientCount": rng.randint(0, 8),
+                "usedIngredients": [{"name": n} for n in query[:used]],
+                "missedIngredients": [],
+            })
+        store.save("GET", f"{SPOONACULAR}/recipes/findByIngredients",
+                   {"ingredients": ",".join(query), "number": SEARCH_NUMBER, "ranking": 1, "ignorePantry": True},
+                   _response(hits))
+        for name in query:
+            meals = [
+                {"idMeal": str(52000 + rng.randint(0, 400)), "strMeal": f"{name.title()} Meal {k}",
+                 "strMealThumb": f"https://www.themealdb.com/images/media/meals/{k}.jpg"}
+                for k in range(rng.randint(3, 25))
+            ]
+            store.save("GET", f"{MEALDB}/filter.php", {"i": normalize(name).replace(" ", "_")},
+                       _response({"meals": meals}))
+    return store
+
+
+def ingredient_lines(count):
+    """`count` free-text ingredient lines like the ones a meal plan collects."""
+    lines = []
+    rid = RECIPE_ID_BASE
+    while len(lines) < count:
+        lines.extend(i["original"] for i in recipe_info(rid)["extendedIngredients"])
+        rid += 1
+    return lines[:count]
@@ -0,0 +1,324 @@
+# benchmarks/run.py
+"""
+Benchmarks for the hot paths, replayed from recorded upstream responses.
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --only favorites_route,parse_nutrition_data --baseline last.json
+
+Each case reports p50/p95/p99 latency and allocations per call, measured
+in a separate tracemalloc pass. With --baseline, exits non-zero when a
+case's p95 got slower than the baseline by more than --tolerance.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark. The decorated setup(args) returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def percentile(sorted_samples, pct):
+    # nearest-rank, so p99 of 100 samples is the 99th one
+    index = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def measure(fn, iterations, warmup, alloc_iterations):
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc.collect()
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    samples.sort()
+
+    tracemalloc.start()
+    peaks, nets = [], []
+    for _ in range(alloc_iterations):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        nets.append(current - before)
+    snapshot_before = tracemalloc.take_snapshot()
+    fn()
+    blocks = sum(
+        stat.count_diff
+        for stat in tracemalloc.take_snapshot().compare_to(snapshot_before, "lineno")
+        if stat.count_diff > 0
+    )
+    tracemalloc.stop()
+
+    return {
+        "iterations":   iterations,
+        "p50_ms":       round(percentile(samples, 50), 4),
+        "p95_ms":       round(percentile(samples, 95), 4),
+        "p99_ms":       round(percentile(samples, 99), 4),
+        "mean_ms":      round(sum(samples) / len(samples), 4),
+        "min_ms":       round(samples[0], 4),
+        "max_ms":       round(samples[-1], 4),
+        "alloc_peak_kb": round(max(peaks) / 1024, 2),
+        "alloc_net_kb":  round(sum(nets) / len(nets) / 1024, 2),
+        "alloc_blocks":  blocks,
+    }
+
+
+# ---- cases ----
+
+@case("find_by_ingredients")
+def _find_by_ingredients(args):
+    from benchmarks.fixtures import QUERIES, SEARCH_NUMBER
+    from services import recipes
+
+    # measure the upstream path: the local corpus would answer repeat queries
+    recipes.LOCAL_MIN_RESULTS = sys.maxsize
+    queries = iter_cycle(QUERIES)
+    return lambda: recipes.find_by_ingredients(next(queries), number=SEARCH_NUMBER)
+
+
+@case("find_by_ingredients_local")
+def _find_by_ingredients_local(args):
+    from benchmarks.fixtures import QUERIES, SEARCH_NUMBER
+    from services import recipes
+
+    for query in QUERIES:
+        recipes._remember(recipes._search_engine.search_sync(query, SEARCH_NUMBER))
+    queries = iter_cycle(QUERIES)
+    return lambda: recipes._local_matches(next(queries), SEARCH_NUMBER)
+
+
+@case("get_recipe_info_cold")
+def _get_recipe_info_cold(args):
+    from benchmarks.fixtures import recipe_ids
+    from services import recipes
+
+    ids = iter_cycle(recipe_ids())
+
+    def run():
+        recipes.recipe_cache.clear()
+        recipes.get_recipe_info(next(ids))
+    return run
+
+
+@case("get_recipe_info_warm")
+def _get_recipe_info_warm(args):
+    from benchmarks.fixtures import recipe_ids
+    from services import recipes
+
+    ids = recipe_ids()
+    for rid in ids:
+        recipes.get_recipe(rid)
+    cycle = iter_cycle(ids)
+    return lambda: recipes.get_recipe_info(next(cycle))
+
+
+@case("favorites_route")
+def _favorites_route(args):
+    import app as web
+    from benchmarks.fixtures import recipe_info, recipe_ids
+    from models import db, User, SavedRecipe
+    from services.recipe_model import Recipe
+    from services.snapshots import card_snapshot
+
+    with web.app.app_context():
+        user = User(username="bench", email="bench@example.com")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.flush()
+        ids = recipe_ids()
+        for n in range(args.favorites):
+            rid = ids[n % len(ids)] + (n // len(ids)) * 1000
+            row = SavedRecipe(user_id=user.id, api_source="spoonacular", recipe_id=rid)
+            row.apply_snapshot(card_snapshot(Recipe.from_spoonacular(recipe_info(ids[n % len(ids)]))))
+            db.session.add(row)
+        db.session.commit()
+        user_id = user.id
+
+    client = web.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+
+    def run():
+        resp = client.get("/favorites")
+        assert resp.status_code == 200, resp.status_code
+    return run
+
+
+@case("normalize_ingredients")
+def _normalize_ingredients(args):
+    from benchmarks.fixtures import ingredient_lines
+    from services.normalizer import normalizer, normalize_many
+
+    lines = ingredient_lines(args.lines)
+
+    def run():
+        # a cold memo is the worst case: every line is normalized from scratch
+        normalizer.normalize.cache_clear()
+        normalize_many(lines)
+    return run
+
+
+@case("aggregate_ingredients")
+def _aggregate_ingredients(args):
+    from benchmarks.fixtures import ingredient_lines
+    from services.normalizer import normalizer
+    from services.quantities import aggregate_ingredients
+
+    lines = ingredient_lines(args.lines)
+
+    def run():
+        normalizer.normalize.cache_clear()
+        aggregate_ingredients(lines)
+    return run
+
+
+@case("parse_nutrition_data")
+def _parse_nutrition_data(args):
+    from benchmarks.fixtures import recipe_info, recipe_ids
+    from services.nutrition_parse import parse_nutrition_data
+
+    nutrition = [recipe_info(rid)["nutrition"] for rid in recipe_ids()]
+    data = iter_cycle(nutrition)
+    return lambda: parse_nutrition_data(next(data))
+
+
+@case("parse_nutrition_batch")
+def _parse_nutrition_batch(args):
+    from benchmarks.fixtures import recipe_info, recipe_ids
+    from services.nutrition_parse import parse_many
+
+    nutrition = [recipe_info(rid)["nutrition"] for rid in recipe_ids()]
+    return lambda: parse_many(nutrition)
+
+
+def iter_cycle(items):
+    while True:
+        yield from items
+
+
+# ---- runner ----
+
+def _configure_env(fixtures_dir, workdir):
+    """Must run before any service module is imported: they read these at import time."""
+    os.environ["HTTP_MODE"] = "replay"
+    os.environ["HTTP_FIXTURES_DIR"] = fixtures_dir
+    os.environ.pop("HTTP_STANDIN_URL", None)
+    os.environ["RECIPE_CACHE_BACKEND"] = "memory"
+    os.environ["RECIPE_CORPUS_PATH"] = os.path.join(workdir, "corpus.sqlite3")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "bench.db")
+    os.environ["SNAPSHOT_REFRESH_INTERVAL"] = "0"
+    os.environ["HOMEPAGE_WARM_INTERVAL"] = "0"
+    os.environ["SQLALCHEMY_ECHO"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _regressions(results, baseline_path, tolerance):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+    slower = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or "p95_ms" not in result or "p95_ms" not in before:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            slower.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recipe hot paths.")
+    parser.add_argument("--only", help="comma separated case names")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--alloc-iterations", type=int, default=20)
+    parser.add_argument("--favorites", type=int, default=500, help="saved recipes for the /favorites case")
+    parser.add_argument("--lines", type=int, default=10_000, help="ingredient lines for the normalize/aggregate cases")
+    parser.add_argument("--fixtures", help="recorded responses to replay (default: generated)")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier report to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (have: {', '.join(CASES)})")
+
+    workdir = tempfile.mkdtemp(prefix="recipe-bench-")
+    fixtures_dir = args.fixtures or os.path.join(workdir, "fixtures")
+    _configure_env(fixtures_dir, workdir)
+    if not args.fixtures:
+        from benchmarks import fixtures
+        fixtures.build(fixtures_dir)
+
+    results = {}
+    for name in names:
+        try:
+            fn = CASES[name](args)
+        except ImportError as e:
+            # e.g. the desktop-only dependencies on a server box
+            results[name] = {"skipped": str(e)}
+            print(f"[WARN] {name} skipped: {e}", file=sys.stderr)
+            continue
+        results[name] = measure(fn, args.iterations, args.warmup, args.alloc_iterations)
+        r = results[name]
+        print(f"[INFO] {name}: p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  p99 {r['p99_ms']}ms  "
+              f"peak {r['alloc_peak_kb']}KiB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp":  datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit":     _git_commit(),
+            "python":     platform.python_version(),
+            "platform":   platform.platform(),
+            "fixtures":   args.fixtures or "generated",
+            "iterations": args.iterations,
+            "favorites":  args.favorites,
+            "lines":      args.lines,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        slower = _regressions(results, args.baseline, args.tolerance)
+        for line in slower:
+            print(f"[ERROR] Regression {line}", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
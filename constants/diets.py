@@ -1,12 +1,17 @@
 #constants/diets.py
+import logging
 import os
 import json
 import requests
 from dotenv import load_dotenv
 
+from services import http_client
+
 load_dotenv()
 API_KEY = os.getenv("SPOONACULAR_API_KEY")
 
+log = logging.getLogger(__name__)
+
 DIETS_CACHE_FILE = os.path.join(os.path.dirname(__file__), "diets_cache.json")
 DEFAULT_DIETS = ["vegetarian", "vegan", "gluten free", "ketogenic", "paleo", "pescetarian"]
 
@@ -17,12 +22,12 @@ def fetch_diets_from_api():
             "apiKey": API_KEY,
             "number": 1  # We don’t need results, just access the diet filters
         }
-        response = requests.get(url, params=params, timeout=5)
+        response = http_client.get(url, params=params, timeout=5)
         if response.status_code == 200:
             # Spoonacular does not directly return valid diets, so we fallback to known safe list.
             return DEFAULT_DIETS
     except requests.RequestException as e:
-        print(f"[ERROR] Failed to fetch diets: {e}")
+        log.error("Failed to fetch diets: %s", e)
     return None
 
 def get_all_diets():
@@ -1,6 +1,11 @@
 """Database models for the RecipeFinder application."""
+import logging
+
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
@@ -41,12 +46,64 @@ class User(db.Model):
     
 class SavedRecipe(db.Model):
     __tablename__ = "saved_recipes"
+    __table_args__ = (
+        # one row per user and recipe; also serves every lookup by user_id
+        db.Index("ux_saved_recipes_user_recipe", "user_id", "api_source", "recipe_id", unique=True),
+        # the favorites list: newest first for one user
+        db.Index("ix_saved_recipes_user_saved_at", "user_id", db.text("saved_at DESC")),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     api_source = db.Column(db.String(32), nullable=False)
     recipe_id = db.Column(db.Integer, nullable=False)
     title = db.Column(db.String(200), nullable=False)
     saved_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+    # Card snapshot so the favorites page can render without calling the API
+    image = db.Column(db.String(500), nullable=True)
+    ready_in_minutes = db.Column(db.Integer, nullable=True)
+    servings = db.Column(db.Integer, nullable=True)
+    diets = db.Column(db.JSON, nullable=True)
+    snapshot_at = db.Column(db.DateTime, nullable=True)
+    # last refresh attempt, successful or not; rotates rows that keep failing to the back
+    snapshot_tried_at = db.Column(db.DateTime, nullable=True)
+
+    def apply_snapshot(self, snapshot):
+        for key, value in snapshot.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def upsert(cls, user_id, api_source, recipe_id, snapshot):
+        """
+        Save a recipe for a user in one statement, or refresh its card snapshot
+        if it's already saved. Two racing saves can't create duplicates.
+        The caller commits.
+        """
+        keys = {"user_id": user_id, "api_source": api_source, "recipe_id": recipe_id}
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            return cls._insert_or_update(keys, snapshot)
+
+        stmt = insert(cls).values(**keys, **snapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: stmt.excluded[name] for name in snapshot},
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def _insert_or_update(cls, keys, snapshot):
+        # databases without ON CONFLICT: let the unique index arbitrate
+        try:
+            with db.session.begin_nested():
+                row = cls(**keys)
+                row.apply_snapshot(snapshot)
+                db.session.add(row)
+        except IntegrityError:
+            cls.query.filter_by(**keys).update(snapshot)
 
 class MealPlan(db.Model):
     __tablename__ = "meal_plans"
@@ -65,3 +122,63 @@ class AuditLog(db.Model):
     details = db.Column(db.Text, nullable=True)
     # Optional relationship back to user
     user = db.relationship('User', backref=db.backref('audit_logs', cascade='all, delete-orphan'))
+
+
+# Columns added after the first release; create_all() won't add them to existing tables
+_ADDED_COLUMNS = {
+    "saved_recipes": {
+        "image": "VARCHAR(500)",
+        "ready_in_minutes": "INTEGER",
+        "servings": "INTEGER",
+        "diets": "JSON",
+        "snapshot_at": "TIMESTAMP",
+        "snapshot_tried_at": "TIMESTAMP",
+    },
+}
+
+def upgrade_schema():
+    """Bring an existing database up to date with the models. Safe to run on every start."""
+    inspector = db.inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    changed = False
+    with db.engine.begin() as conn:
+        for table, columns in _ADDED_COLUMNS.items():
+            if table not in tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    changed = True
+        if "saved_recipes" in tables:
+            changed |= _upgrade_saved_recipe_indexes(conn, inspector)
+    if changed:
+        # pooled SQLite connections keep the schema they loaded; start fresh ones
+        db.engine.dispose()
+
+
+def _upgrade_saved_recipe_indexes(conn, inspector):
+    existing = {ix["name"] for ix in inspector.get_indexes("saved_recipes")}
+    wanted = {"ux_saved_recipes_user_recipe", "ix_saved_recipes_user_saved_at"}
+    if wanted <= existing and "ix_saved_recipes_user_id" not in existing:
+        return False
+    if "ux_saved_recipes_user_recipe" not in existing:
+        # older versions could save the same recipe twice; keep the first save
+        removed = conn.execute(db.text(
+            "DELETE FROM saved_recipes WHERE id NOT IN ("
+            " SELECT MIN(id) FROM saved_recipes GROUP BY user_id, api_source, recipe_id)"
+        )).rowcount
+        if removed:
+            log.info("Removed %d duplicate saved recipes before adding the unique index.", removed)
+        conn.execute(db.text(
+            "CREATE UNIQUE INDEX ux_saved_recipes_user_recipe"
+            " ON saved_recipes (user_id, api_source, recipe_id)"
+        ))
+    if "ix_saved_recipes_user_saved_at" not in existing:
+        conn.execute(db.text(
+            "CREATE INDEX ix_saved_recipes_user_saved_at ON saved_recipes (user_id, saved_at DESC)"
+        ))
+    # covered by both indexes above
+    if "ix_saved_recipes_user_id" in existing:
+        conn.execute(db.text("DROP INDEX ix_saved_recipes_user_id"))
+    return True
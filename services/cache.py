@@ -0,0 +1,297 @@
+# services/cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from services import metrics
+from services.storage import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    In-process cache with a max size and a per-entry TTL.
+    Least recently used entries are evicted first once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key, value, ttl=None):
+        """Set `key` only if it is absent or expired. Returns whether it was set."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] >= now:
+                return False
+            self._data[key] = (value, now + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class JSONCodec:
+    """Default value encoding for SQLiteCache."""
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, separators=(",", ":"))
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class SQLiteCache:
+    """
+    On-disk cache backed by SQLite so several gunicorn workers
+    (or the desktop app and the web app) share the same entries.
+    Values are stored as JSON unless another `codec` (dumps/loads) is given.
+    """
+
+    def __init__(self, path, ttl=3600, table="cache", codec=JSONCodec):
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self.codec = codec
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads, keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            f"SELECT value, expires FROM {self.table} WHERE key = ?", (str(key),)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires = row
+        if expires < time.time():
+            self.delete(key)
+            return default
+        try:
+            return self.codec.loads(value)
+        except Exception as e:
+            # written by a newer format, or with msgpack by a process that has it
+            log.warning("Dropping undecodable cache entry %s: %s", key, e)
+            self.delete(key)
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        self._conn().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+            (str(key), self.codec.dumps(value), expires)
+        )
+
+    def add(self, key, value, ttl=None):
+        """
+        Set `key` only if it is absent or expired, in one statement, so exactly
+        one process wins. Returns whether it was set.
+        """
+        now = time.time()
+        cur = self._conn().execute(
+            f"INSERT INTO {self.table} (key, value, expires) VALUES (?, ?, ?)"
+            f" ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires"
+            f" WHERE {self.table}.expires < ?",
+            (str(key), self.codec.dumps(value), now + (self.ttl if ttl is None else ttl), now)
+        )
+        return cur.rowcount == 1
+
+    def delete(self, key):
+        self._conn().execute(f"DELETE FROM {self.table} WHERE key = ?", (str(key),))
+
+    def clear(self):
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def purge_expired(self):
+        self._conn().execute(f"DELETE FROM {self.table} WHERE expires < ?", (time.time(),))
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """Checks a fast in-process cache first, then a shared backend."""
+
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+
+    def get(self, key, default=None):
+        value = self.front.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.back.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.front.set(key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        # the front copy never outlives its own TTL, so other workers' writes show up
+        self.front.set(key, value, None if ttl is None else min(ttl, self.front.ttl))
+        self.back.set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        # decided by the shared backend alone; the front copy could be another worker's stale view
+        if not self.back.add(key, value, ttl):
+            return False
+        self.front.set(key, value, None if ttl is None else min(ttl, self.front.ttl))
+        return True
+
+    def delete(self, key):
+        self.front.delete(key)
+        self.back.delete(key)
+
+    def clear(self):
+        self.front.clear()
+        self.back.clear()
+
+
+class InstrumentedCache:
+    """Counts hits and misses of a named cache in services.metrics."""
+
+    def __init__(self, cache, name):
+        self.cache = cache
+        self.name = name
+
+    def get(self, key, default=None):
+        value = self.cache.get(key, _MISSING)
+        metrics.record_cache(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        self.cache.set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        return self.cache.add(key, value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key: the first caller runs `fn`,
+    every other caller for that key blocks and receives the same result.
+    """
+
+    class _Call:
+        __slots__ = ("event", "result", "error")
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+def make_cache(name, maxsize=512, ttl=3600, front_ttl=300, codec=JSONCodec):
+    """
+    Builds a cache from env settings:
+      RECIPE_CACHE_BACKEND = memory | sqlite  (default: sqlite)
+      RECIPE_CACHE_PATH    = path of the shared SQLite file
+    With the SQLite backend, entries are also kept in process for `front_ttl` seconds
+    and stored on disk through `codec`.
+    """
+    backend = os.getenv("RECIPE_CACHE_BACKEND", "sqlite").lower()
+    if backend == "memory":
+        return InstrumentedCache(LRUCache(maxsize=maxsize, ttl=ttl), name)
+    front = LRUCache(maxsize=maxsize, ttl=min(ttl, front_ttl))
+    path = os.getenv("RECIPE_CACHE_PATH", os.path.join(DATA_DIR, "cache.sqlite3"))
+    try:
+        cache = TieredCache(front, SQLiteCache(path, ttl=ttl, table=name, codec=codec))
+    except sqlite3.Error as e:
+        log.warning("SQLite cache unavailable (%s), using memory only.", e)
+        cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    return InstrumentedCache(cache, name)
@@ -0,0 +1,186 @@
+# services/corpus.py
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from services.normalizer import normalize, normalize_many
+from services.storage import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+CORPUS_PATH = os.getenv("RECIPE_CORPUS_PATH", os.path.join(DATA_DIR, "corpus.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    key         TEXT PRIMARY KEY,
+    source      TEXT NOT NULL,
+    recipe_id   TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    image       TEXT,
+    summary     TEXT,
+    ingredient_count INTEGER NOT NULL DEFAULT 0,
+    updated     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredient_index (
+    ingredient  TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    PRIMARY KEY (ingredient, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_ingredient_index_key ON ingredient_index (key);
+"""
+
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(key UNINDEXED, title, summary)"
+
+_TAGS = re.compile(r"<[^>]+>")
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_ingredient(name):
+    return normalize(name or "")
+
+
+def _recipe_ingredients(info):
+    """Ingredient names from either a full info dict or a findByIngredients hit."""
+    items = info.get("extendedIngredients")
+    if items is None:
+        items = (info.get("usedIngredients") or []) + (info.get("missedIngredients") or [])
+    names = set(normalize_many([item.get("name") or item.get("original", "") for item in items]))
+    names.discard("")
+    return names
+
+
+class RecipeCorpus:
+    """
+    Local store of every recipe we've seen upstream, with an inverted index
+    from normalized ingredient to recipe and a full-text index over titles
+    and summaries, so common searches can be answered without the network.
+    """
+
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        try:
+            conn.execute(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            log.warning("SQLite has no FTS5, text search disabled.")
+            self.has_fts = False
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def index_recipe(self, info, source="spoonacular"):
+        self.index_many([info], source)
+
+    def index_many(self, recipes, source="spoonacular"):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            for info in recipes:
+                if not info or info.get("id") is None:
+                    continue
+                src = info.get("source") or source
+                key = f"{src}:{info['id']}"
+                title = info.get("title") or info.get("name") or ""
+                summary = _TAGS.sub("", info.get("summary") or "") or None
+                ingredients = _recipe_ingredients(info)
+                conn.execute(
+                    "INSERT INTO recipes (key, source, recipe_id, title, image, summary, ingredient_count, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET"
+                    "  title = excluded.title,"
+                    "  image = COALESCE(excluded.image, image),"
+                    "  summary = COALESCE(excluded.summary, summary),"
+                    "  ingredient_count = CASE WHEN excluded.ingredient_count > 0"
+                    "    THEN excluded.ingredient_count ELSE ingredient_count END,"
+                    "  updated = excluded.updated",
+                    (key, src, str(info["id"]), title, info.get("image"), summary, len(ingredients), now)
+                )
+                if ingredients:
+                    conn.execute("DELETE FROM ingredient_index WHERE key = ?", (key,))
+                    conn.executemany(
+                        "INSERT INTO ingredient_index (ingredient, key) VALUES (?, ?)",
+                        [(name, key) for name in ingredients]
+                    )
+                if self.has_fts:
+                    row = conn.execute("SELECT summary FROM recipes WHERE key = ?", (key,)).fetchone()
+                    conn.execute("DELETE FROM recipes_fts WHERE key = ?", (key,))
+                    conn.execute(
+                        "INSERT INTO recipes_fts (key, title, summary) VALUES (?, ?, ?)",
+                        (key, title, row[0] or "")
+                    )
+
+    def search(self, ingredients, number=10):
+        """
+        Recipes using the most of `ingredients`, in findByIngredients shape
+        (plus usedIngredientCount / missedIngredientCount).
+        """
+        wanted = sorted({normalize_ingredient(i) for i in ingredients} - {""})
+        if not wanted:
+            return []
+        marks = ",".join("?" * len(wanted))
+        rows = self._conn().execute(
+            "SELECT r.source, r.recipe_id, r.title, r.image, r.ingredient_count, COUNT(*) AS used"
+            f" FROM ingredient_index i JOIN recipes r ON r.key = i.key"
+            f" WHERE i.ingredient IN ({marks})"
+            " GROUP BY i.key"
+            " ORDER BY used DESC, r.ingredient_count - used ASC"
+            " LIMIT ?",
+            (*wanted, number)
+        ).fetchall()
+        return [self._hit(row, used) for *row, used in rows]
+
+    def search_text(self, query, number=10):
+        """Recipes whose title or summary match every word of `query`, best match first."""
+        if not self.has_fts or not query.strip():
+            return []
+        terms = " ".join(f'"{t}"' for t in _NON_WORD.sub(" ", query).split())
+        if not terms:
+            return []
+        rows = self._conn().execute(
+            "SELECT r.source, r.recipe_id, r.title, r.image, r.ingredient_count"
+            " FROM recipes_fts f JOIN recipes r ON r.key = f.key"
+            " WHERE recipes_fts MATCH ? ORDER BY rank LIMIT ?",
+            (terms, number)
+        ).fetchall()
+        return [self._hit(row) for row in rows]
+
+    def random_sample(self, number=8):
+        """A few random recipes with pictures, for pages that just need something to show."""
+        rows = self._conn().execute(
+            "SELECT source, recipe_id, title, image, ingredient_count FROM recipes"
+            " WHERE image IS NOT NULL AND image != '' ORDER BY RANDOM() LIMIT ?",
+            (number,)
+        ).fetchall()
+        return [self._hit(row) for row in rows]
+
+    @staticmethod
+    def _hit(row, used=0):
+        source, recipe_id, title, image, ingredient_count = row
+        return {
+            "id":                    int(recipe_id) if recipe_id.isdigit() else recipe_id,
+            "title":                 title,
+            "image":                 image,
+            "source":                source,
+            "usedIngredientCount":   used,
+            "missedIngredientCount": max(ingredient_count - used, 0),
+        }
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+
+corpus = RecipeCorpus()
@@ -1,6 +1,7 @@
 # services/email_service.py
 import os
-import requests
+
+from services import http_client
 
 MAILGUN_API_KEY = os.getenv("MAILGUN_API_KEY")
 MAILGUN_DOMAIN = os.getenv("MAILGUN_DOMAIN")
@@ -11,7 +12,7 @@ def send_email(to, subject, text):
     if not MAILGUN_API_KEY or not MAILGUN_DOMAIN:
         raise RuntimeError("Missing Mailgun API configuration.")
 
-    return requests.post(
+    return http_client.post(
         f"{MAILGUN_BASE_URL}/messages",
         auth=("api", MAILGUN_API_KEY),
         data={
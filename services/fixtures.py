@@ -0,0 +1,99 @@
+# services/fixtures.py
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.getenv("HTTP_FIXTURES_DIR", os.path.join(BASE_DIR, "data", "fixtures"))
+
+# never written to disk and never part of a fixture's identity
+SECRET_PARAMS = {"apiKey", "api_key", "key", "token"}
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def canonical_request(method, url, params=None):
+    """
+    'GET host/path?a=1&b=2': scheme, secrets and parameter order don't matter,
+    so a live URL, a stand-in URL and a replayed call all map to the same fixture.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(k, str(v)) for k, v in (params or {}).items() if v is not None]
+    query = sorted((k, v) for k, v in query if k not in SECRET_PARAMS)
+    qs = "&".join(f"{k}={v}" for k, v in query)
+    return f"{method.upper()} {parts.netloc}{parts.path}" + (f"?{qs}" if qs else "")
+
+
+def fixture_key(method, url, params=None):
+    return hashlib.sha1(canonical_request(method, url, params).encode("utf-8")).hexdigest()[:20]
+
+
+class FixtureStore:
+    """
+    Recorded upstream responses, one JSON file per request under
+    <root>/<host>/<key>.json so recordings stay easy to browse and edit.
+    """
+
+    def __init__(self, root=FIXTURES_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def path_for(self, method, url, params=None):
+        host = urlsplit(url).netloc or "local"
+        return os.path.join(self.root, host, fixture_key(method, url, params) + ".json")
+
+    def load(self, method, url, params=None):
+        try:
+            with open(self.path_for(method, url, params), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            log.error("Unreadable fixture for %s: %s", canonical_request(method, url, params), e)
+            return None
+
+    def save(self, method, url, params, resp):
+        fixture = {
+            "request": canonical_request(method, url, params),
+            "status":  resp.status_code,
+            "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+        }
+        try:
+            fixture["body"] = resp.content.decode("utf-8")
+        except UnicodeDecodeError:
+            fixture["body_b64"] = base64.b64encode(resp.content).decode("ascii")
+
+        path = self.path_for(method, url, params)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(fixture, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, path)
+
+    @staticmethod
+    def body(fixture):
+        if "body_b64" in fixture:
+            return base64.b64decode(fixture["body_b64"])
+        return fixture.get("body", "").encode("utf-8")
+
+    @classmethod
+    def to_response(cls, fixture, url):
+        """A requests.Response carrying a recorded answer, as if it came off the wire."""
+        resp = requests.Response()
+        resp.status_code = fixture.get("status", 200)
+        resp.headers = CaseInsensitiveDict(fixture.get("headers") or {})
+        resp._content = cls.body(fixture)
+        resp.encoding = "utf-8"
+        resp.url = url
+        resp.reason = "Replayed"
+        return resp
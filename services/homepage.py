@@ -0,0 +1,108 @@
+# services/homepage.py
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from services.cache import make_cache, LRUCache
+from services.corpus import corpus
+from services.recipe_model import hit_card
+from services.search import get_random_recipes
+
+log = logging.getLogger(__name__)
+
+# The pool is served as-is while fresh, and served stale while a refresh runs
+POOL_SIZE = int(os.getenv("HOMEPAGE_POOL_SIZE", 32))
+POOL_FRESH_FOR = int(os.getenv("HOMEPAGE_FRESH_FOR", 6 * 3600))
+# How long one visitor keeps seeing the same selection before it rotates
+ROTATE_EVERY = int(os.getenv("HOMEPAGE_ROTATE_EVERY", 600))
+WARM_INTERVAL = int(os.getenv("HOMEPAGE_WARM_INTERVAL", 900))
+
+# shared by every worker; entries outlive freshness so stale pools stay servable
+_shared = make_cache("homepage", maxsize=8, ttl=7 * 24 * 3600, front_ttl=30)
+_pages = LRUCache(maxsize=2048, ttl=ROTATE_EVERY)
+_refresh_lock = threading.Lock()
+
+
+def refresh_pool():
+    """Fetch a new pool of random recipes. Returns False if another refresh is running."""
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    marked = False
+    try:
+        # other workers skip their refresh while this marker is set; add() checks
+        # and sets it in one step, so two workers can't both take it
+        if not _shared.add("refreshing", True, ttl=60):
+            return False
+        marked = True
+        recipes = get_random_recipes(number=POOL_SIZE)
+        if recipes:
+            _shared.set("pool", {"recipes": [hit_card(r) for r in recipes], "fetched_at": time.time()})
+        return True
+    except Exception:
+        log.exception("Homepage pool refresh failed")
+        return False
+    finally:
+        if marked:
+            _shared.delete("refreshing")
+        _refresh_lock.release()
+
+
+def _is_stale(pool):
+    return pool is None or time.time() - pool["fetched_at"] > POOL_FRESH_FOR
+
+
+def _refresh_in_background():
+    threading.Thread(target=refresh_pool, name="homepage-refresh", daemon=True).start()
+
+
+def get_pool():
+    pool = _shared.get("pool")
+    if _is_stale(pool) and not _refresh_lock.locked():
+        _refresh_in_background()
+    return pool["recipes"] if pool else []
+
+
+def get_homepage_recipes(user_id=None, language="en", number=8):
+    """
+    Recipes for one visitor's homepage. Never waits on an upstream call:
+    picks from the shared pool (refreshed in the background), or from the
+    local corpus while the pool is still empty.
+    """
+    key = (language, user_id)
+    page = _pages.get(key)
+    if page is not None:
+        return page
+
+    pool = get_pool()
+    if pool:
+        page = random.sample(pool, min(number, len(pool)))
+    else:
+        try:
+            page = corpus.random_sample(number)
+        except sqlite3.Error:
+            page = []
+        if not page:
+            # don't pin an empty page for the whole rotation period
+            return page
+    _pages.set(key, page)
+    return page
+
+
+def start_homepage_warmer(interval=WARM_INTERVAL):
+    """Keeps the pool fresh on a daemon thread so visitors never trigger the refill."""
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+
+    def loop():
+        delay = 0
+        while not stop.wait(delay):
+            delay = interval
+            if _is_stale(_shared.get("pool")):
+                refresh_pool()
+
+    threading.Thread(target=loop, name="homepage-warmer", daemon=True).start()
+    return stop
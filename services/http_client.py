@@ -0,0 +1,146 @@
+# services/http_client.py
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import metrics
+from services.fixtures import FixtureStore, canonical_request
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 8)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+MODES = ("live", "record", "replay")
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for every upstream we talk to.
+
+    * one pooled, keep-alive requests.Session per host
+    * at most `max_per_host` requests in flight per host
+    * idempotent requests are retried on connection errors and 429/5xx,
+      with exponential backoff and full jitter
+
+    `mode` is "live", "record" (live, and every answer is saved to
+    `fixtures`) or "replay" (answers only come from `fixtures`, nothing
+    touches the network). With `standin_url` set, requests go to the local
+    stand-in server (services/standin.py) instead of the real hosts.
+    """
+
+    def __init__(self, max_retries=2, backoff=0.25, max_per_host=8, pool_size=16, timeout=DEFAULT_TIMEOUT,
+                 mode="live", fixtures=None, standin_url=None):
+        if mode not in MODES:
+            raise ValueError(f"unknown HTTP mode {mode!r}, expected one of {MODES}")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_per_host = max_per_host
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.mode = mode
+        self.fixtures = fixtures or FixtureStore()
+        self.standin_url = standin_url.rstrip("/") if standin_url else None
+        self._sessions = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return session, self._semaphores[host]
+
+    @property
+    def offline(self):
+        """True when upstream answers come from recordings rather than the real APIs."""
+        return self.mode == "replay" or self.standin_url is not None
+
+    def _route(self, url):
+        if self.standin_url is None:
+            return url
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.standin_url}/{parts.netloc}{parts.path}{query}"
+
+    def _replay(self, method, url, params):
+        fixture = self.fixtures.load(method, url, params)
+        if fixture is None:
+            raise requests.ConnectionError(f"No recorded response for {canonical_request(method, url, params)}")
+        return FixtureStore.to_response(fixture, url)
+
+    @staticmethod
+    def _traced(url, send, *args, **kwargs):
+        # every attempt is its own span, so retries show up in the breakdown
+        parts = urlsplit(url)
+        started = time.perf_counter()
+        status, nbytes = "error", 0
+        try:
+            resp = send(*args, **kwargs)
+            status, nbytes = resp.status_code, len(resp.content)
+            return resp
+        finally:
+            metrics.record_upstream(parts.netloc, parts.path, status, nbytes, time.perf_counter() - started)
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, url, retries=None, **kwargs):
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        if retries is None:
+            retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        if self.mode == "replay":
+            return self._traced(url, self._replay, method, url, kwargs.get("params"))
+
+        target = self._route(url)
+        session, semaphore = self._host_state(urlsplit(target).netloc)
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            try:
+                with semaphore:
+                    resp = self._traced(url, session.request, method, target, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+            else:
+                if last or resp.status_code not in RETRY_STATUSES:
+                    if self.mode == "record" and resp.status_code < 500:
+                        self.fixtures.save(method, url, kwargs.get("params"), resp)
+                    return resp
+                resp.close()
+            self._sleep_before_retry(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._semaphores.clear()
+
+
+client = HttpClient(
+    max_retries=int(os.getenv("HTTP_MAX_RETRIES", 2)),
+    max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", 8)),
+    mode=os.getenv("HTTP_MODE", "live").lower(),
+    standin_url=os.getenv("HTTP_STANDIN_URL") or None,
+)
+
+get = client.get
+post = client.post
@@ -0,0 +1,136 @@
+# services/logs.py
+"""
+Logging setup shared by the web app and the tools.
+
+Records are queued by the calling thread and written by a single listener
+thread, so a slow terminal or disk never holds up a request. Configured
+from env:
+
+  LOG_LEVEL         root level (default INFO)
+  LOG_LEVELS        per-logger overrides, e.g. "services.recipes=DEBUG,sqlalchemy.engine=INFO"
+  LOG_FORMAT        json | text (default json)
+  LOG_FILE          also write to this file
+  LOG_DEBUG_SAMPLE  share of DEBUG records kept (default 1.0)
+  LOG_QUEUE_SIZE    records buffered before new ones are dropped (default 10000)
+
+A record can ask to be sampled on its own with extra={"sample_rate": 0.01}.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# attributes every LogRecord has; anything else came in through `extra`
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, then any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts":     datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level":  record.levelname,
+            "logger": record.name,
+            "msg":    record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `debug_rate` of DEBUG records, and `sample_rate` of records that set one."""
+
+    def __init__(self, debug_rate=1.0):
+        super().__init__()
+        self.debug_rate = debug_rate
+
+    def filter(self, record):
+        rate = getattr(record, "sample_rate", None)
+        if rate is None and record.levelno <= logging.DEBUG:
+            rate = self.debug_rate
+        if rate is None or rate >= 1.0:
+            return True
+        return random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or raising."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # format the message and traceback here, on the calling thread, but keep
+        # them apart so the listener's formatter can still structure them
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=None, fmt=None, levels=None, log_file=None):
+    """Route every logger through the queue. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "json")).lower()
+    log_file = log_file or os.getenv("LOG_FILE")
+
+    formatter = JSONFormatter() if fmt == "json" else logging.Formatter(
+        "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+    )
+    outputs = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        outputs.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in outputs:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE", 1.0))))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    for name, logger_level in {**_parse_levels(os.getenv("LOG_LEVELS")), **(levels or {})}.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _listener = QueueListener(log_queue, *outputs, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,294 @@
+# services/metrics.py
+import contextvars
+import os
+import re
+import threading
+import time
+
+# seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# spans kept per request for the debug breakdown
+MAX_SPANS = 100
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            row = self._values.get(label_values)
+            if row is None:
+                row = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for label_values, row in items:
+            for bound, count in zip(self.buckets, row):
+                le = _labels(self.labels + ("le",), label_values + (_number(bound),))
+                yield f"{self.name}_bucket{le} {count}"
+            yield f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + ('+Inf',))} {row[-1]}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {_number(row[-2])}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {row[-1]}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Everything in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.histogram(
+    "http_request_duration_seconds", "Time to handle a request, until the response headers.",
+    ("method", "route", "status"))
+upstream_requests = registry.histogram(
+    "upstream_request_duration_seconds", "Time spent waiting on an upstream API call.",
+    ("provider", "endpoint", "status"))
+upstream_bytes = registry.counter(
+    "upstream_response_bytes_total", "Bytes received from upstream APIs.", ("provider", "endpoint"))
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+db_queries = registry.histogram(
+    "db_queries_per_request", "SQL statements run while handling one request.", ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+
+
+# ---- per-request trace ----
+
+class Trace:
+    """What one request spent its time on. Shared by every thread working for it."""
+
+    __slots__ = ("started", "spans", "db_queries", "db_seconds", "upstream_seconds", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.upstream_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_span(self, kind, name, seconds, **attrs):
+        with self._lock:
+            if kind == "upstream":
+                self.upstream_seconds += seconds
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append({"kind": kind, "name": name, "ms": round(seconds * 1000, 2), **attrs})
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace():
+    return _current.get()
+
+
+def start_trace():
+    trace = Trace()
+    return trace, _current.set(trace)
+
+
+def end_trace(token):
+    _current.reset(token)
+
+
+def in_current_context(fn):
+    """
+    Wrap `fn` so that, on whatever thread it runs, it still records into the
+    caller's trace. Use when handing work to an executor.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # each call gets its own copy: one Context can't be entered by two threads at once
+        return ctx.copy().run(fn, *args, **kwargs)
+    return run
+
+
+# ---- recording helpers ----
+
+_PROVIDERS = {
+    "api.spoonacular.com": "spoonacular",
+    "www.themealdb.com":   "mealdb",
+    "themealdb.com":       "mealdb",
+}
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def provider_for(host):
+    return _PROVIDERS.get(host, host)
+
+
+def endpoint_for(path):
+    # keep label cardinality bounded: /recipes/716429/information -> /recipes/:id/information
+    return _ID_SEGMENT.sub("/:id", path) or "/"
+
+
+def record_upstream(host, path, status, nbytes, seconds):
+    provider = provider_for(host)
+    endpoint = endpoint_for(path)
+    upstream_requests.observe(seconds, provider, endpoint, str(status))
+    upstream_bytes.inc(provider, endpoint, amount=nbytes)
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span("upstream", f"{provider} {endpoint}", seconds, status=status, bytes=nbytes)
+
+
+def record_cache(cache, hit):
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span("cache", cache, 0.0, result="hit" if hit else "miss")
+
+
+def instrument_sqlalchemy(engine):
+    """Count statements (and their time) against the current request's trace."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        trace = _current.get()
+        if trace is not None:
+            trace.add_query(time.perf_counter() - started)
+
+
+# ---- Flask wiring ----
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# honour X-Debug-Timing: 1 from clients; leaks internals, so off by default
+DEBUG_HEADER = os.getenv("METRICS_DEBUG_HEADER", "0") == "1"
+
+
+def server_timing(trace, total):
+    """Server-Timing header value: shows up in the browser's network panel."""
+    cache_hits = sum(1 for s in trace.spans if s["kind"] == "cache" and s["result"] == "hit")
+    cache_misses = sum(1 for s in trace.spans if s["kind"] == "cache" and s["result"] == "miss")
+    upstream_calls = sum(1 for s in trace.spans if s["kind"] == "upstream")
+    parts = [
+        f"total;dur={total * 1000:.1f}",
+        f'db;dur={trace.db_seconds * 1000:.1f};desc="{trace.db_queries} queries"',
+        f'upstream;dur={trace.upstream_seconds * 1000:.1f};desc="{upstream_calls} calls"',
+        f'cache;desc="{cache_hits} hit {cache_misses} miss"',
+    ]
+    parts.extend(
+        f'u{i};dur={s["ms"]};desc="{s["name"]} {s["status"]} {s["bytes"]}B"'
+        for i, s in enumerate(s for s in trace.spans if s["kind"] == "upstream")
+    )
+    return ", ".join(parts)
+
+
+def init_app(app, db=None):
+    """Route timing, per-request DB/upstream accounting and GET /metrics."""
+    from flask import g, request, Response, abort
+
+    if db is not None:
+        with app.app_context():
+            instrument_sqlalchemy(db.engine)
+
+    @app.before_request
+    def _start():
+        g.trace, g.trace_token = start_trace()
+
+    @app.after_request
+    def _finish(response):
+        trace = g.pop("trace", None)
+        if trace is None:
+            return response
+        total = trace.elapsed()
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        http_requests.observe(total, request.method, route, str(response.status_code))
+        db_queries.observe(trace.db_queries, route)
+        if DEBUG_HEADER and request.headers.get("X-Debug-Timing") == "1":
+            response.headers["Server-Timing"] = server_timing(trace, total)
+        return response
+
+    @app.teardown_request
+    def _end(exc=None):
+        token = g.pop("trace_token", None)
+        if token is not None:
+            end_trace(token)
+
+    @app.route("/metrics")
+    def metrics():
+        if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+            abort(401)
+        return Response(registry.expose(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,113 @@
+# services/normalizer.py
+import re
+from functools import lru_cache
+
+from data.ingredient_map import normalization_map
+
+UNITS = (
+    "cup|cups|tbsp|tsp|teaspoon|tablespoon|package|slice|pieces|oz|ml|g|kg|pound|lb|"
+    "clove|dash|pinch|quart|liter|stick|can|pkg|bunch|handful|boxes"
+)
+DESCRIPTORS = (
+    "chopped|sliced|minced|diced|fresh|optional|to taste|large|small|medium|extra|firm|soft|"
+    "finely|roughly|thinly|ground|crushed|real|size|rinsed|cut|high grade|korean|baby|cooked|"
+    "uncooked|prepared|regular|julienned|into 1inch cubes|available at asian markets"
+)
+
+# Parentheses, quantities (with optional unit) and descriptors in one scan
+_NOISE = re.compile(
+    r"\(.*?\)"
+    rf"|\b(?:\d+/\d+|\d+\.\d+|\d+)\s*(?:{UNITS})?\b"
+    rf"|\b(?:{DESCRIPTORS})\b"
+)
+_PUNCT = re.compile(r"[^\w\s]")
+
+_END = object()
+
+
+class IngredientNormalizer:
+    """
+    Turns a free-text ingredient line ("2 cloves garlic, minced") into the
+    canonical ingredient name used for grouping ("garlic").
+
+    The normalization map is compiled once into a lookup table and a token
+    trie. A cleaned line that is itself a map phrase or canonical name resolves
+    directly; otherwise it resolves to the longest map phrase that ends on its
+    head noun (the last word, since English puts it last), or to itself, so
+    modifiers like "broth" or "juice" keep "chicken broth" apart from "chicken".
+    """
+
+    def __init__(self, mapping=normalization_map, memo_size=8192):
+        self._trie = {}
+        self._whole = {}
+        cleaned = [(phrase, " ".join(self.clean(phrase).split()), canonical) for phrase, canonical in mapping.items()]
+        loose = [(key, canonical) for phrase, key, canonical in cleaned if key and key != phrase]
+        exact = [(key, canonical) for phrase, key, canonical in cleaned if key and key == phrase]
+
+        # Later writes win. Keys that only clean to a phrase ("minced beef" -> "beef")
+        # lose to keys that are already clean, and for whole lines also to canonical
+        # names, so "1 lb ground beef" stays "beef".
+        for key, canonical in loose + exact:
+            self._insert(key.split(), canonical)
+        self._whole.update(loose)
+        self._whole.update((canonical, canonical) for canonical in mapping.values())
+        self._whole.update(exact)
+        self.normalize = lru_cache(maxsize=memo_size)(self._normalize)
+
+    def _insert(self, tokens, canonical):
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = canonical
+
+    @staticmethod
+    def clean(line):
+        cleaned = _NOISE.sub(" ", line.lower())
+        cleaned = _PUNCT.sub("", cleaned)
+        return " ".join(cleaned.split())
+
+    def _match(self, tokens):
+        # Only phrases ending on the last token (the head noun) count: "chicken
+        # breast" is chicken, "chicken broth" is not. A plural head also tries
+        # its singular, so "garlic cloves" finds "garlic clove".
+        heads = [tokens[-1]]
+        if tokens[-1].endswith("es"):
+            heads.append(tokens[-1][:-2])
+        if tokens[-1].endswith("s"):
+            heads.append(tokens[-1][:-1])
+        for start in range(len(tokens)):  # earliest start = longest phrase
+            node = self._trie
+            for token in tokens[start:-1]:
+                node = node.get(token)
+                if node is None:
+                    break
+            else:
+                for head in heads:
+                    end = node.get(head, {}).get(_END)
+                    if end is not None:
+                        return end
+        return None
+
+    def _normalize(self, line):
+        cleaned = self.clean(line)
+        if not cleaned:
+            return ""
+        whole = self._whole.get(cleaned)
+        if whole is not None:
+            return whole
+        return self._match(cleaned.split()) or cleaned
+
+    def normalize_many(self, lines):
+        normalize = self.normalize
+        return [normalize(line) for line in lines]
+
+
+normalizer = IngredientNormalizer()
+
+
+def normalize(line):
+    return normalizer.normalize(line)
+
+
+def normalize_many(lines):
+    return normalizer.normalize_many(lines)
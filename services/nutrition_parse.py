@@ -1,36 +1,166 @@
-#api/nutrition_parse.py
-def parse_nutrition_data(data: dict) -> dict:
-    result = {}
+# services/nutrition_parse.py
+import logging
+from enum import IntEnum
+
+log = logging.getLogger(__name__)
+
+
+class NutrientId(IntEnum):
+    """The nutrients the app works with; the value is the slot in NutritionFacts."""
+    CALORIES = 0
+    PROTEIN = 1
+    FAT = 2
+    SATURATED_FAT = 3
+    CARBOHYDRATES = 4
+    NET_CARBOHYDRATES = 5
+    SUGAR = 6
+    FIBER = 7
+    CHOLESTEROL = 8
+    SODIUM = 9
+
+
+# Spoonacular's names -> slot
+NUTRIENT_NAMES = {
+    "Calories":          NutrientId.CALORIES,
+    "Protein":           NutrientId.PROTEIN,
+    "Fat":               NutrientId.FAT,
+    "Saturated Fat":     NutrientId.SATURATED_FAT,
+    "Carbohydrates":     NutrientId.CARBOHYDRATES,
+    "Net Carbohydrates": NutrientId.NET_CARBOHYDRATES,
+    "Sugar":             NutrientId.SUGAR,
+    "Fiber":             NutrientId.FIBER,
+    "Cholesterol":       NutrientId.CHOLESTEROL,
+    "Sodium":            NutrientId.SODIUM,
+}
+
+# keys of the dict parse_nutrition_data has always returned
+LEGACY_KEYS = {
+    "calories": NutrientId.CALORIES,
+    "protein":  NutrientId.PROTEIN,
+    "fat":      NutrientId.FAT,
+    "carbs":    NutrientId.CARBOHYDRATES,
+    "sugar":    NutrientId.SUGAR,
+    "fiber":    NutrientId.FIBER,
+}
+
+_SLOTS = len(NutrientId)
+
+
+class NutritionFacts:
+    """
+    One recipe's nutrition, parsed once.
+
+    Amounts, units and %DV of the known nutrients sit in fixed-size lists
+    indexed by NutrientId, so reading one is a list lookup rather than a scan
+    of the upstream list. `rows` keeps every nutrient, known or not, in
+    upstream order for display.
+    """
+
+    __slots__ = ("amounts", "units", "daily", "rows")
+
+    def __init__(self):
+        self.amounts = [None] * _SLOTS
+        self.units = [None] * _SLOTS
+        self.daily = [None] * _SLOTS
+        self.rows = ()
+
+    def amount(self, nutrient):
+        return self.amounts[nutrient]
+
+    def unit(self, nutrient):
+        return self.units[nutrient]
+
+    def percent_of_daily_needs(self, nutrient):
+        return self.daily[nutrient]
+
+    def vector(self, missing=0.0):
+        """Amounts in NutrientId order, with `missing` for nutrients not reported."""
+        return [missing if a is None else a for a in self.amounts]
 
+    def as_dict(self):
+        return {key: self.amounts[nid] for key, nid in LEGACY_KEYS.items()}
+
+    def summary(self, limit=10):
+        return [
+            f"{title}: {amount} {unit} ({daily}% daily)"
+            for title, amount, unit, daily in self.rows[:limit]
+        ]
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def __repr__(self):
+        known = ", ".join(
+            f"{nid.name.lower()}={self.amounts[nid]}{self.units[nid] or ''}"
+            for nid in NutrientId if self.amounts[nid] is not None
+        )
+        return f"NutritionFacts({known})"
+
+
+def _number(value):
+    if isinstance(value, (int, float)):
+        return value
     try:
-        nutrients = data.get("nutrients", [])
-        result["calories"] = next((n["amount"] for n in nutrients if n["name"] == "Calories"), None)
-        result["protein"] = next((n["amount"] for n in nutrients if n["name"] == "Protein"), None)
-        result["fat"] = next((n["amount"] for n in nutrients if n["name"] == "Fat"), None)
-        result["carbs"] = next((n["amount"] for n in nutrients if n["name"] == "Carbohydrates"), None)
-        result["sugar"] = next((n["amount"] for n in nutrients if n["name"] == "Sugar"), None)
-        result["fiber"] = next((n["amount"] for n in nutrients if n["name"] == "Fiber"), None)
-    except Exception as e:
-        print(f"[ERROR] Failed to parse nutrition data: {e}")
-
-    return result
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_nutrients(data) -> NutritionFacts:
+    """
+    Single pass over a nutrition payload: {"nutrients": [...]}, the bare list,
+    or a Recipe's parsed `nutrients`.
+    """
+    facts = NutritionFacts()
+    if isinstance(data, dict):
+        nutrients = data.get("nutrients") or []
+    else:
+        nutrients = data or []
+
+    rows = []
+    for n in nutrients:
+        if isinstance(n, dict):
+            name = n.get("name")
+            title = n.get("title", name or "Unknown")
+            amount, unit, daily = n.get("amount"), n.get("unit", ""), n.get("percentOfDailyNeeds")
+        elif isinstance(n, tuple) and len(n) == 4:  # recipe_model.Nutrient
+            name, amount, unit, daily = n
+            title = name or "Unknown"
+        else:
+            log.warning("Skipping malformed nutrient: %r", n)
+            continue
+
+        rows.append((
+            title,
+            "?" if amount is None else amount,
+            unit or "",
+            "?" if daily is None else daily,
+        ))
+        nid = NUTRIENT_NAMES.get(name)
+        if nid is not None and facts.amounts[nid] is None:
+            facts.amounts[nid] = _number(amount)
+            facts.units[nid] = unit or ""
+            facts.daily[nid] = _number(daily)
+
+    facts.rows = tuple(rows)
+    return facts
+
+
+def parse_many(payloads) -> list:
+    """NutritionFacts for many recipes at once; accepts payloads or Recipe objects."""
+    parse = parse_nutrients
+    return [
+        parse(p.nutrients if hasattr(p, "nutrients") else p)
+        for p in payloads
+    ]
+
+
+def parse_nutrition_data(data: dict) -> dict:
+    return parse_nutrients(data).as_dict()
+
 
 def parse_nutrition_summary(data: dict, limit=10) -> list[str]:
     """
     Returns a list of formatted strings for the top nutrients.
     """
-    lines = []
-    try:
-        nutrients = data.get("nutrients", [])
-        for n in nutrients[:limit]:
-            try:
-                title = n.get("title", n.get("name", "Unknown"))
-                amount = n.get("amount", "?")
-                unit = n.get("unit", "")
-                daily = n.get("percentOfDailyNeeds", "?")
-                lines.append(f"{title}: {amount} {unit} ({daily}% daily)")
-            except KeyError as e:
-                print(f"[WARN] Skipping nutrient due to missing key: {e}")
-    except Exception as e:
-        print(f"[ERROR] Failed to summarize nutrition data: {e}")
-    return lines
+    return parse_nutrients(data).summary(limit)
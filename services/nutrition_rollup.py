@@ -0,0 +1,186 @@
+# services/nutrition_rollup.py
+import logging
+import os
+
+import numpy as np
+
+from services.nutrition_parse import NutrientId, parse_many
+from services.recipe_model import Recipe
+from services.recipes import get_recipes_bulk
+
+log = logging.getLogger(__name__)
+
+# a year of plan; entries beyond it are reported, not allocated
+MAX_WEEKS = 53
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+
+# Daily values for adults (US FDA labelling); None: no daily value
+DEFAULT_TARGETS = {
+    NutrientId.CALORIES:          2000,
+    NutrientId.PROTEIN:           50,
+    NutrientId.FAT:               78,
+    NutrientId.SATURATED_FAT:     20,
+    NutrientId.CARBOHYDRATES:     275,
+    NutrientId.NET_CARBOHYDRATES: None,
+    NutrientId.SUGAR:             50,
+    NutrientId.FIBER:             28,
+    NutrientId.CHOLESTEROL:       300,
+    NutrientId.SODIUM:            2300,
+}
+DEFAULT_UNITS = {
+    NutrientId.CALORIES:    "kcal",
+    NutrientId.CHOLESTEROL: "mg",
+    NutrientId.SODIUM:      "mg",
+}
+
+
+def nutrient_key(nid):
+    return nid.name.lower()
+
+
+def parse_targets(spec):
+    """'calories=2200,protein=60' -> {NutrientId.CALORIES: 2200.0, ...}; unknown names are ignored."""
+    targets = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        nid = NutrientId.__members__.get(name.strip().upper())
+        if nid is None or not value.strip():
+            continue
+        try:
+            targets[nid] = float(value)
+        except ValueError:
+            log.warning("Ignoring nutrition target %r", item)
+    return targets
+
+
+def load_targets(overrides=None):
+    """DEFAULT_TARGETS, then NUTRITION_TARGETS from env, then `overrides` (NutrientId or name keys)."""
+    targets = dict(DEFAULT_TARGETS)
+    targets.update(parse_targets(os.getenv("NUTRITION_TARGETS")))
+    for key, value in (overrides or {}).items():
+        nid = key if isinstance(key, NutrientId) else NutrientId.__members__.get(str(key).upper())
+        if nid is not None:
+            targets[nid] = None if value is None else float(value)
+    # a zero or negative target has no meaningful %DV
+    return {nid: value if value and value > 0 else None for nid, value in targets.items()}
+
+
+def plan_entries(data):
+    """Entries of a stored plan: the desktop's list, or a web plan's {"entries": [...]}."""
+    if isinstance(data, dict):
+        data = data.get("entries") or data.get("meals") or []
+    return [e for e in data or [] if isinstance(e, dict)]
+
+
+class NutritionRollup:
+    """
+    Nutrition totals for a meal plan.
+
+    `per_day` is (weeks * 7) x nutrients, `per_week` is weeks x nutrients, both
+    in NutrientId column order; the *_dv arrays are the same totals as a
+    percentage of the daily target (x7 for weeks), NaN where there is none.
+    """
+
+    def __init__(self, per_day, per_week, targets, units, unresolved):
+        self.per_day = per_day
+        self.per_week = per_week
+        self.targets = targets
+        self.units = units
+        self.unresolved = unresolved
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.per_day_dv = per_day / targets * 100
+            self.per_week_dv = per_week / (targets * 7) * 100
+
+    @property
+    def weeks(self):
+        return len(self.per_week)
+
+    def to_dict(self, decimals=1):
+        def values(row):
+            return {nutrient_key(nid): _plain(row[nid], decimals) for nid in NutrientId}
+
+        return {
+            "nutrients": [
+                {"key": nutrient_key(nid), "unit": self.units[nid], "target": _plain(self.targets[nid], decimals)}
+                for nid in NutrientId
+            ],
+            "days": [
+                {
+                    "week": slot // 7 + 1,
+                    "day": DAYS[slot % 7],
+                    "totals": values(self.per_day[slot]),
+                    "percentDV": values(self.per_day_dv[slot]),
+                }
+                for slot in range(len(self.per_day))
+            ],
+            "weeks": [
+                {
+                    "week": week + 1,
+                    "totals": values(self.per_week[week]),
+                    "percentDV": values(self.per_week_dv[week]),
+                }
+                for week in range(self.weeks)
+            ],
+            "unresolved": self.unresolved,
+        }
+
+
+def _plain(value, decimals):
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), decimals)
+
+
+def rollup(entries, recipes, targets=None):
+    """
+    Totals for plan `entries` ({"day", "id", optional "week" (1-based) and
+    "portions"}) given `recipes` {id: Recipe or info dict}. Nutrients are per
+    serving upstream, so each entry counts `portions` servings (default 1).
+    An entry's "servings" is what the recipe makes, not what is eaten, and is
+    not used. Entries with an unknown recipe or day, a week past MAX_WEEKS or
+    a portion count that isn't positive are listed in `unresolved`.
+    """
+    targets = load_targets(targets)
+    row_of = {rid: i for i, rid in enumerate(recipes)}
+    facts = parse_many(r if isinstance(r, Recipe) else Recipe.from_info(r) for r in recipes.values())
+
+    # recipes x nutrients, per serving
+    matrix = np.array([f.vector() for f in facts], dtype=float).reshape(len(facts), len(NutrientId))
+
+    rows, slots, portions, unresolved = [], [], [], []
+    for entry in entries:
+        day = _DAY_INDEX.get(entry.get("day"))
+        row = row_of.get(entry.get("id"))
+        try:
+            week = int(entry.get("week", 1)) - 1
+            eaten = float(entry.get("portions", 1))
+        except (TypeError, ValueError):
+            day = None
+        if day is None or row is None or not 0 <= week < MAX_WEEKS or not eaten > 0:
+            unresolved.append({k: entry.get(k) for k in ("week", "day", "meal", "id", "title") if k in entry})
+            continue
+        rows.append(row)
+        slots.append(week * 7 + day)
+        portions.append(eaten)
+
+    weeks = max(slots) // 7 + 1 if slots else 1
+    per_day = np.zeros((weeks * 7, len(NutrientId)))
+    if rows:
+        # each planned meal's nutrients scaled by the portions eaten, summed into its day
+        np.add.at(per_day, np.array(slots), matrix[rows] * np.array(portions)[:, None])
+    per_week = per_day.reshape(weeks, 7, len(NutrientId)).sum(axis=1)
+
+    units = {}
+    for nid in NutrientId:
+        units[nid] = next((f.units[nid] for f in facts if f.units[nid]), DEFAULT_UNITS.get(nid, "g"))
+    target_row = np.array([np.nan if targets[nid] is None else targets[nid] for nid in NutrientId], dtype=float)
+
+    return NutritionRollup(per_day, per_week, target_row, units, unresolved)
+
+
+def plan_rollup(entries, targets=None):
+    """rollup() for a plan, fetching its recipes in one bulk call (mostly cache hits)."""
+    ids = list(dict.fromkeys(e["id"] for e in entries if e.get("id") is not None))
+    return rollup(entries, get_recipes_bulk(ids) if ids else {}, targets)
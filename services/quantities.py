@@ -0,0 +1,176 @@
+# services/quantities.py
+import re
+from collections import defaultdict
+from fractions import Fraction
+
+from services.normalizer import normalize
+
+VOLUME, MASS, COUNT = "volume", "mass", "count"
+
+# alias -> (canonical unit, dimension, size in the dimension's base unit: ml / g / 1)
+_UNIT_TABLE = {
+    ("tsp", VOLUME, 4.92892): ("tsp", "tsps", "teaspoon", "teaspoons", "t"),
+    ("tbsp", VOLUME, 14.7868): ("tbsp", "tbsps", "tbs", "tablespoon", "tablespoons", "T"),
+    ("cup", VOLUME, 236.588): ("cup", "cups", "c"),
+    ("fl oz", VOLUME, 29.5735): ("fl oz", "fluid ounce", "fluid ounces"),
+    ("pint", VOLUME, 473.176): ("pint", "pints", "pt"),
+    ("quart", VOLUME, 946.353): ("quart", "quarts", "qt"),
+    ("ml", VOLUME, 1.0): ("ml", "milliliter", "milliliters", "millilitre", "millilitres"),
+    ("l", VOLUME, 1000.0): ("l", "liter", "liters", "litre", "litres"),
+    ("g", MASS, 1.0): ("g", "gram", "grams", "gr"),
+    ("kg", MASS, 1000.0): ("kg", "kilogram", "kilograms"),
+    ("oz", MASS, 28.3495): ("oz", "ounce", "ounces"),
+    ("lb", MASS, 453.592): ("lb", "lbs", "pound", "pounds"),
+    ("clove", COUNT, 1.0): ("clove", "cloves"),
+    ("can", COUNT, 1.0): ("can", "cans"),
+    ("jar", COUNT, 1.0): ("jar", "jars"),
+    ("package", COUNT, 1.0): ("package", "packages", "pkg", "box", "boxes"),
+    ("slice", COUNT, 1.0): ("slice", "slices"),
+    ("stick", COUNT, 1.0): ("stick", "sticks"),
+    ("bunch", COUNT, 1.0): ("bunch", "bunches"),
+    ("handful", COUNT, 1.0): ("handful", "handfuls"),
+    ("pinch", COUNT, 1.0): ("pinch", "pinches"),
+    ("dash", COUNT, 1.0): ("dash", "dashes"),
+    ("", COUNT, 1.0): ("", "piece", "pieces", "whole", "large", "medium", "small", "serving", "servings"),
+}
+UNITS = {alias: spec for spec, aliases in _UNIT_TABLE.items() for alias in aliases}
+_METRIC = {"ml", "l", "g", "kg"}
+
+_VULGAR = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8"}
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?"
+_QUANTITY = re.compile(
+    rf"^\s*(?P<num>{_NUMBER})(?:\s*(?:-|to)\s*(?:{_NUMBER}))?"
+    # a package size between count and unit: "1 (14 oz) can"
+    r"(?:\s*\([^)]*\))?"
+    r"\s*(?P<unit>fl\.?\s*oz|fluid ounces?|[A-Za-z]+\.?)?"
+)
+
+
+def _to_number(text):
+    parts = text.split()
+    return float(sum(Fraction(p) for p in parts))
+
+
+def lookup_unit(unit):
+    """(canonical, dimension, factor) for a unit string, or None if it isn't a unit."""
+    unit = " ".join((unit or "").replace(".", " ").split())
+    if unit in ("t", "T"):
+        return UNITS[unit]
+    return UNITS.get(unit.lower())
+
+
+def split_quantity(text):
+    """
+    Split the leading quantity off an ingredient line:
+    "1 1/2 cups flour" -> (1.5, "cups", "flour").
+    Ranges use the lower bound. The unit is None when the word after the
+    number isn't a known unit ("4 green onions" -> (4.0, None, "green onions")).
+    A parenthesized package size is skipped, so the container is the unit:
+    "1 (14 oz) can diced tomatoes" -> (1.0, "can", "diced tomatoes").
+    Lines without a leading number give (None, None, text).
+    """
+    for char, frac in _VULGAR.items():
+        text = text.replace(char, f" {frac}")
+    match = _QUANTITY.match(text)
+    if not match:
+        return None, None, text.strip()
+    unit = match.group("unit")
+    end = match.end()
+    if unit and lookup_unit(unit) is None:
+        unit = None
+        end = match.start("unit")
+    return _to_number(match.group("num")), unit, text[end:].strip()
+
+
+def parse_quantity(text):
+    """(amount, unit) of an ingredient line, see split_quantity()."""
+    amount, unit, _ = split_quantity(text)
+    return amount, unit
+
+
+def format_amount(amount):
+    """Whole numbers and the closest common kitchen fraction (halves, thirds, quarters, eighths)."""
+    frac = min(
+        (Fraction(round(amount * d), d) for d in (1, 2, 3, 4, 8)),
+        key=lambda f: (abs(f - Fraction(amount)), f.denominator)
+    )
+    if frac == 0:
+        return f"{amount:.2g}"
+    whole, rest = divmod(frac, 1)
+    if not rest:
+        return str(whole)
+    return f"{whole} {rest}" if whole else str(rest)
+
+
+def _plural(unit, amount):
+    if not unit or amount <= 1:
+        return unit
+    return unit + ("es" if unit.endswith(("ch", "sh")) else "s")
+
+
+def _format_total(dimension, base, metric):
+    if dimension == VOLUME:
+        if metric:
+            return f"{base / 1000:.2g} l" if base >= 1000 else f"{round(base)} ml"
+        for unit in ("cup", "tbsp"):
+            size = UNITS[unit][2]
+            if base >= size * (0.25 if unit == "cup" else 1):
+                return f"{format_amount(base / size)} {unit}{'s' if unit == 'cup' and base > size else ''}"
+        return f"{format_amount(base / UNITS['tsp'][2])} tsp"
+    if metric:
+        return f"{base / 1000:.3g} kg" if base >= 1000 else f"{round(base)} g"
+    if base >= UNITS["lb"][2]:
+        return f"{format_amount(base / UNITS['lb'][2])} lb"
+    return f"{format_amount(base / UNITS['oz'][2])} oz"
+
+
+def aggregate_ingredients(items):
+    """
+    Merge ingredient entries into one summary line per ingredient.
+
+    `items` are Spoonacular extendedIngredients-style dicts (structured
+    amount/unit/name are used when present) or plain text lines, which are
+    parsed as a fallback. Quantities of the same dimension are converted and
+    summed; volumes and weights can't be combined without densities so they
+    are listed side by side. Lines without a usable quantity are kept as-is.
+
+    Returns {ingredient: [lines]} sorted by ingredient.
+    """
+    totals = defaultdict(dict)     # name -> {(dimension, unit_key): [base, metric]}
+    leftovers = defaultdict(list)  # name -> original lines we couldn't quantify
+
+    for item in items:
+        if isinstance(item, dict):
+            original = (item.get("original") or "").strip()
+            name = normalize(item.get("name") or original)
+            amount, unit = item.get("amount"), item.get("unit")
+            if not amount:
+                amount, unit = parse_quantity(original)
+        else:
+            original = item.strip()
+            amount, unit, rest = split_quantity(original)
+            name = normalize(rest)
+
+        spec = lookup_unit(unit) if amount else None
+        if not name or spec is None:
+            leftovers[name or original.lower()].append(original)
+            continue
+
+        canonical, dimension, factor = spec
+        # volume and mass each sum into one bucket, counts are kept per unit
+        key = (dimension, "" if dimension != COUNT else canonical)
+        bucket = totals[name].setdefault(key, [0.0, False])
+        bucket[0] += float(amount) * factor
+        bucket[1] = bucket[1] or canonical in _METRIC
+
+    grouped = {}
+    for name in sorted(set(totals) | set(leftovers)):
+        parts = []
+        for (dimension, unit), (base, metric) in sorted(totals.get(name, {}).items()):
+            if dimension == COUNT:
+                parts.append(f"{format_amount(base)} {_plural(unit, base)}".strip())
+            else:
+                parts.append(_format_total(dimension, base, metric))
+        lines = [" + ".join(parts)] if parts else []
+        grouped[name] = lines + leftovers.get(name, [])
+    return grouped
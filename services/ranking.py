@@ -0,0 +1,77 @@
+# services/ranking.py
+import re
+
+# titles this similar (trigram Jaccard) are treated as the same dish
+DUPLICATE_THRESHOLD = 0.75
+# providers that don't report missing ingredients are ranked as if this many were missing
+UNKNOWN_MISSED = 4
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_FILLER = {"a", "an", "and", "the", "with", "of", "in", "recipe", "easy", "best", "homemade", "style"}
+
+
+def title_key(title):
+    """Lowercased title without punctuation or filler words: 'The Best Chicken-Curry!' -> 'chicken curry'."""
+    words = _NON_WORD.sub(" ", (title or "").lower()).split()
+    return " ".join(w for w in words if w not in _FILLER) or " ".join(words)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def coverage(hit, wanted_count):
+    """Share of the searched ingredients a findByIngredients-style hit uses."""
+    if not wanted_count:
+        return 0.0
+    return min(hit.get("usedIngredientCount") or 0, wanted_count) / wanted_count
+
+
+def _missed(hit):
+    missed = hit.get("missedIngredientCount")
+    return UNKNOWN_MISSED if missed is None else missed
+
+
+def merge_ranked(batches, wanted_count, number=None, threshold=DUPLICATE_THRESHOLD):
+    """
+    Merge result lists from several providers into one ranked list.
+
+    `batches` is a list of result lists, best provider first. Near-duplicate
+    titles are collapsed (the copy from the earlier batch wins), then hits are
+    ordered by ingredient coverage, fewest missing ingredients, and finally
+    provider order.
+    """
+    kept = []  # (coverage, missed, batch index, position, trigrams, hit)
+    for rank, results in enumerate(batches):
+        for pos, hit in enumerate(results):
+            grams = trigrams(title_key(hit.get("title") or hit.get("name")))
+            if any(similarity(grams, other[4]) >= threshold for other in kept):
+                continue
+            kept.append((coverage(hit, wanted_count), _missed(hit), rank, pos, grams, hit))
+
+    kept.sort(key=lambda k: (-k[0], k[1], k[2], k[3]))
+    ranked = [k[5] for k in kept]
+    return ranked if number is None else ranked[:number]
+
+
+def drop_duplicates(results, seen, threshold=DUPLICATE_THRESHOLD):
+    """
+    Hits from `results` whose titles aren't near-duplicates of anything in
+    `seen` (a list of trigram sets, extended in place).
+    """
+    fresh = []
+    for hit in results:
+        grams = trigrams(title_key(hit.get("title") or hit.get("name")))
+        if any(similarity(grams, other) >= threshold for other in seen):
+            continue
+        seen.append(grams)
+        fresh.append(hit)
+    return fresh
@@ -0,0 +1,261 @@
+# services/recipe_model.py
+import json
+import re
+from collections import namedtuple
+
+try:
+    import msgpack
+except ImportError:  # compact JSON is used instead
+    msgpack = None
+
+Ingredient = namedtuple("Ingredient", "original name amount unit")
+Nutrient = namedtuple("Nutrient", "name amount unit percent_of_daily_needs")
+
+DIET_FLAGS = ("vegetarian", "vegan", "glutenFree", "dairyFree", "ketogenic")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\r?\n+")
+_FORMAT_VERSION = 1
+
+
+class Recipe:
+    """
+    One recipe, whichever provider it came from.
+
+    Immutable and slotted so cached recipes stay small. Instructions and
+    nutrition are kept in their raw upstream form and only parsed the first
+    time `steps` / `nutrients` are read.
+    """
+
+    __slots__ = (
+        "id", "source", "title", "image", "ready_in_minutes", "servings",
+        "source_url", "summary", "diets", "flags", "ingredients",
+        "_steps_raw", "_steps", "_nutrients_raw", "_nutrients",
+    )
+
+    def __init__(self, id, source, title, image=None, ready_in_minutes=None, servings=None,
+                 source_url=None, summary="", diets=(), flags=(), ingredients=(),
+                 steps_raw=None, nutrients_raw=None, steps=None, nutrients=None):
+        init = object.__setattr__
+        init(self, "id", id)
+        init(self, "source", source)
+        init(self, "title", title)
+        init(self, "image", image or None)
+        init(self, "ready_in_minutes", ready_in_minutes)
+        init(self, "servings", servings)
+        init(self, "source_url", source_url or None)
+        init(self, "summary", summary or "")
+        init(self, "diets", tuple(diets))
+        init(self, "flags", tuple(flags))
+        init(self, "ingredients", tuple(ingredients))
+        init(self, "_steps_raw", steps_raw)
+        init(self, "_steps", None if steps is None else tuple(steps))
+        init(self, "_nutrients_raw", nutrients_raw)
+        init(self, "_nutrients", None if nutrients is None else tuple(nutrients))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Recipe is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Recipe is immutable")
+
+    def __repr__(self):
+        return f"Recipe({self.source}:{self.id} {self.title!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Recipe) and (self.source, self.id) == (other.source, other.id)
+
+    def __hash__(self):
+        return hash((self.source, self.id))
+
+    # ---- lazily parsed parts ----
+
+    @property
+    def steps(self):
+        if self._steps is None:
+            raw = self._steps_raw
+            if isinstance(raw, str):
+                steps = [s.strip() for s in _SENTENCE_END.split(raw) if s.strip()]
+            else:
+                steps = [
+                    step.get("step", "")
+                    for block in raw or []
+                    for step in block.get("steps", [])
+                ]
+            # the raw form is kept: a shared instance may be read by another
+            # thread that hasn't seen the parsed tuple yet
+            steps = tuple(steps)
+            object.__setattr__(self, "_steps", steps)
+            return steps
+        return self._steps
+
+    @property
+    def nutrients(self):
+        if self._nutrients is None:
+            nutrients = tuple(
+                Nutrient(n.get("name", ""), n.get("amount"), n.get("unit", ""), n.get("percentOfDailyNeeds"))
+                for n in self._nutrients_raw or []
+            )
+            object.__setattr__(self, "_nutrients", nutrients)
+            return nutrients
+        return self._nutrients
+
+    # ---- provider adapters ----
+
+    @classmethod
+    def from_spoonacular(cls, info, source="spoonacular"):
+        return cls(
+            id=info.get("id"),
+            source=info.get("source") or source,
+            title=info.get("title") or info.get("name", ""),
+            image=info.get("image"),
+            ready_in_minutes=info.get("readyInMinutes"),
+            servings=info.get("servings"),
+            source_url=info.get("sourceUrl"),
+            summary=info.get("summary", ""),
+            diets=info.get("diets") or (),
+            flags=[flag for flag in DIET_FLAGS if info.get(flag)],
+            ingredients=[
+                Ingredient(i.get("original", ""), i.get("name"), i.get("amount"), i.get("unit"))
+                for i in info.get("extendedIngredients", [])
+            ],
+            steps_raw=info.get("analyzedInstructions") or [],
+            nutrients_raw=(info.get("nutrition") or {}).get("nutrients") or [],
+        )
+
+    @classmethod
+    def from_mealdb(cls, meal):
+        from services.quantities import split_quantity
+
+        ingredients = []
+        for i in range(1, 21):
+            name = (meal.get(f"strIngredient{i}") or "").strip()
+            if not name:
+                continue
+            measure = (meal.get(f"strMeasure{i}") or "").strip()
+            amount, unit, _ = split_quantity(measure) if measure else (None, None, "")
+            original = f"{measure} {name}".strip()
+            ingredients.append(Ingredient(original, name.lower(), amount, unit or ""))
+
+        return cls(
+            id=int(meal["idMeal"]) if str(meal.get("idMeal", "")).isdigit() else meal.get("idMeal"),
+            source="mealdb",
+            title=meal.get("strMeal", "Untitled"),
+            image=meal.get("strMealThumb"),
+            source_url=meal.get("strSource"),
+            summary=meal.get("strInstructions", ""),
+            diets=[t.strip().lower() for t in (meal.get("strTags") or "").split(",") if t.strip()],
+            ingredients=ingredients,
+            steps_raw=meal.get("strInstructions", ""),
+        )
+
+    @classmethod
+    def from_info(cls, info):
+        """Any upstream dict: a raw MealDB meal or a Spoonacular-shaped info dict."""
+        if "idMeal" in info:
+            return cls.from_mealdb(info)
+        return cls.from_spoonacular(info)
+
+    # ---- views ----
+
+    def card(self):
+        return {
+            "id":             self.id,
+            "title":          self.title,
+            "image":          self.image,
+            "source":         self.source,
+            "readyInMinutes": self.ready_in_minutes,
+            "servings":       self.servings,
+        }
+
+    def to_info(self):
+        """Spoonacular-shaped dict for code that still works on raw info dicts."""
+        info = {
+            "id":        self.id,
+            "source":    self.source,
+            "title":     self.title,
+            "image":     self.image or "",
+            "sourceUrl": self.source_url or "",
+            "summary":   self.summary,
+            "diets":     list(self.diets),
+            "extendedIngredients": [i._asdict() for i in self.ingredients],
+            "analyzedInstructions": [{
+                "name": "",
+                "steps": [{"number": n, "step": s} for n, s in enumerate(self.steps, start=1)],
+            }] if self.steps else [],
+            "nutrition": {"nutrients": [
+                {"name": n.name, "title": n.name, "amount": n.amount, "unit": n.unit,
+                 "percentOfDailyNeeds": n.percent_of_daily_needs}
+                for n in self.nutrients
+            ]},
+        }
+        for flag in DIET_FLAGS:
+            info[flag] = flag in self.flags
+        # only real values: MealDB has no timing/servings data
+        if self.ready_in_minutes is not None:
+            info["readyInMinutes"] = self.ready_in_minutes
+        if self.servings is not None:
+            info["servings"] = self.servings
+        return info
+
+    # ---- compact serialization ----
+
+    def _fields(self):
+        return [
+            _FORMAT_VERSION, self.id, self.source, self.title, self.image,
+            self.ready_in_minutes, self.servings, self.source_url, self.summary,
+            list(self.diets), list(self.flags),
+            [list(i) for i in self.ingredients],
+            list(self.steps),
+            [list(n) for n in self.nutrients],
+        ]
+
+    def to_bytes(self):
+        if msgpack is not None:
+            return b"M" + msgpack.packb(self._fields(), use_bin_type=True)
+        return b"J" + json.dumps(self._fields(), separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data):
+        kind, body = data[:1], data[1:]
+        if kind == b"M":
+            if msgpack is None:
+                raise ValueError("msgpack is needed to read this recipe")
+            fields = msgpack.unpackb(body, raw=False)
+        elif kind == b"J":
+            fields = json.loads(body)
+        else:
+            raise ValueError("unknown recipe encoding")
+        (version, id, source, title, image, ready, servings, source_url, summary,
+         diets, flags, ingredients, steps, nutrients) = fields
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported recipe format {version}")
+        return cls(
+            id=id, source=source, title=title, image=image,
+            ready_in_minutes=ready, servings=servings, source_url=source_url,
+            summary=summary, diets=diets, flags=flags,
+            ingredients=[Ingredient(*i) for i in ingredients],
+            steps=steps,
+            nutrients=[Nutrient(*n) for n in nutrients],
+        )
+
+
+def hit_card(hit):
+    """Card fields of a search hit or info dict, whichever provider it came from."""
+    return {
+        "id":     hit.get("id"),
+        "title":  hit.get("title") or hit.get("name", ""),
+        "image":  hit.get("image") or None,
+        "source": hit.get("source") or "spoonacular",
+    }
+
+
+class RecipeCodec:
+    """Cache codec that stores recipes in their compact binary form."""
+
+    @staticmethod
+    def dumps(recipe):
+        return recipe.to_bytes()
+
+    @staticmethod
+    def loads(data):
+        return Recipe.from_bytes(bytes(data))
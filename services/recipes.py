@@ -2,42 +2,101 @@
 import requests
 import os
 import json
+import logging
+import sqlite3
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
 
+from services import http_client
+from services.cache import make_cache, SingleFlight
+from services.corpus import corpus, normalize_ingredient
+from services.metrics import in_current_context
+from services.ranking import coverage, merge_ranked, drop_duplicates
+from services.recipe_model import Recipe, RecipeCodec
+from services.search_engine import SearchEngine, Provider
+
 load_dotenv()
 API_KEY = os.getenv("SPOONACULAR_API_KEY")
 
-if not API_KEY:
-    raise RuntimeError("❌ SPOONACULAR_API_KEY is not set in your .env file.")
+log = logging.getLogger(__name__)
+
+# Without a key only TheMealDB is searched, unless answers are replayed
+# from recorded fixtures (HTTP_MODE=replay or HTTP_STANDIN_URL, see http_client)
+SPOONACULAR_ENABLED = bool(API_KEY) or http_client.client.offline
+if not SPOONACULAR_ENABLED:
+    log.warning("SPOONACULAR_API_KEY is not set, searching TheMealDB only.")
+
+# Recipe details barely change, so keep them around for a while.
+# Entries are compact Recipe records, not the raw upstream JSON.
+RECIPE_CACHE_TTL = int(os.getenv("RECIPE_CACHE_TTL", 24 * 3600))
+recipe_cache = make_cache("recipes", maxsize=1024, ttl=RECIPE_CACHE_TTL, codec=RecipeCodec)
+_recipe_flight = SingleFlight()
 
 # --------------------------
 # Parallel search entrypoint
 # --------------------------
+# Answer from the local corpus when it has at least this many recipes
+# covering LOCAL_MIN_COVERAGE of the searched ingredients
+LOCAL_MIN_RESULTS = int(os.getenv("LOCAL_MIN_RESULTS", 10))
+LOCAL_MIN_COVERAGE = float(os.getenv("LOCAL_MIN_COVERAGE", 1.0))
+
+# Seconds a search waits for each provider. Search calls use them as their
+# HTTP timeout and are not retried: a retry would land after the deadline.
+SPOONACULAR_DEADLINE = float(os.getenv("SPOONACULAR_DEADLINE", 8))
+MEALDB_DEADLINE = float(os.getenv("MEALDB_DEADLINE", 5))
+
+
 def find_by_ingredients(ingredients, number=10):
-    def fetch_spoonacular():
-        try:
-            return _spoonacular_search(ingredients, number)
-        except Exception as e:
-            print("[ERROR] Spoonacular failed:", e)
-            return []
+    local = _local_matches(ingredients, number)
+    if len(local) >= min(number, LOCAL_MIN_RESULTS):
+        return local[:number]
+
+    # Providers are queried concurrently; see _search_engine at the bottom
+    results = _search_engine.search_sync(ingredients, number)
+    _remember(results)
+    return results
 
-    def fetch_themealdb():
-        try:
-            return fallback_themealdb(",".join(ingredients))
-        except Exception as e:
-            print("[ERROR] TheMealDB failed:", e)
-            return []
 
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        spoon_future = executor.submit(fetch_spoonacular)
-        mealdb_future = executor.submit(fetch_themealdb)
+def stream_by_ingredients(ingredients, number=10):
+    """
+    Like find_by_ingredients, but yields (source, results) batches as they
+    arrive: local corpus hits first, then each provider as it answers.
+    """
+    local = _local_matches(ingredients, number)
+    if local:
+        yield "local", local[:number]
+        if len(local) >= min(number, LOCAL_MIN_RESULTS):
+            return
 
-        spoon_results = spoon_future.result()
-        mealdb_results = mealdb_future.result()
+    # later batches skip dishes an earlier source already showed
+    seen = []
+    drop_duplicates(local, seen)
+    for provider, results in _search_engine.stream_sync(ingredients, number):
+        _remember(results)
+        fresh = drop_duplicates(results, seen)
+        if fresh:
+            yield provider, fresh[:number]
 
-    combined = spoon_results + mealdb_results
-    return combined[:number]
+
+def _local_matches(ingredients, number):
+    wanted = {normalize_ingredient(i) for i in ingredients} - {""}
+    if not wanted:
+        return []
+    needed = max(1, round(len(wanted) * LOCAL_MIN_COVERAGE))
+    try:
+        hits = corpus.search(wanted, number)
+    except sqlite3.Error as e:
+        log.error("Local corpus search failed: %s", e)
+        return []
+    return [h for h in hits if h["usedIngredientCount"] >= needed]
+
+
+def _remember(recipes):
+    """Feed upstream responses into the local corpus."""
+    try:
+        corpus.index_many(recipes)
+    except sqlite3.Error as e:
+        log.error("Failed to index recipes locally: %s", e)
 
 
 # --------------------------------
@@ -52,14 +111,65 @@ def _spoonacular_search(ingredients, number=10):
         "ignorePantry": True,
         "apiKey": API_KEY
     }
-    r = requests.get(url, params=params, timeout=8)
+    r = http_client.get(url, params=params, timeout=SPOONACULAR_DEADLINE, retries=0)
     if r.status_code == 200:
         return r.json()
-    print(f"[ERROR] Spoonacular responded with {r.status_code}: {r.text}")
+    log.error("Spoonacular search responded with %s: %s", r.status_code, r.text,
+              extra={"provider": "spoonacular", "status": r.status_code})
     return []
 
 
-def get_recipe_info(recipe_id):
+def _rank_results(ingredients, batches, number):
+    wanted = {normalize_ingredient(i) for i in ingredients} - {""}
+    return merge_ranked(batches, len(wanted) or len(ingredients), number)
+
+
+def _is_unbeatable(ingredients, hit):
+    # nothing ranks above a hit that uses every ingredient and misses none
+    wanted = {normalize_ingredient(i) for i in ingredients} - {""}
+    return coverage(hit, len(wanted) or len(ingredients)) >= 1 and hit.get("missedIngredientCount") == 0
+
+
+def get_recipe(recipe_id, source="spoonacular"):
+    """Recipe details as a Recipe record, or None if they can't be fetched."""
+    if source not in _DETAIL_FETCHERS:
+        return None
+    key = _cache_key(source, recipe_id)
+    recipe = recipe_cache.get(key)
+    if recipe is not None:
+        return recipe
+    # only one thread fetches a given id, the others wait for its result
+    return _recipe_flight.do(key, lambda: _fetch_recipe_cached(recipe_id, source))
+
+
+def get_recipe_info(recipe_id, source="spoonacular"):
+    """Recipe details as a Spoonacular-shaped dict (see Recipe.to_info)."""
+    recipe = get_recipe(recipe_id, source)
+    return recipe.to_info() if recipe is not None else None
+
+
+def _cache_key(source, recipe_id):
+    # ids are only unique per provider: Spoonacular and TheMealDB both use integers
+    return f"{source}:{recipe_id}"
+
+
+def _fetch_recipe_cached(recipe_id, source):
+    key = _cache_key(source, recipe_id)
+    recipe = recipe_cache.get(key)
+    if recipe is None:
+        recipe = _DETAIL_FETCHERS[source](recipe_id)
+        if recipe is not None:
+            _remember([recipe.to_info()])
+            recipe_cache.set(key, recipe)
+    return recipe
+
+
+def _spoonacular_recipe(recipe_id):
+    info = _fetch_recipe_info(recipe_id)
+    return Recipe.from_spoonacular(info) if info is not None else None
+
+
+def _fetch_recipe_info(recipe_id):
     url = f"https://api.spoonacular.com/recipes/{recipe_id}/information"
     params = {
         "includeNutrition": True,
@@ -67,15 +177,93 @@ def get_recipe_info(recipe_id):
         "apiKey": API_KEY
     }
     try:
-        r = requests.get(url, params=params, timeout=8)
+        r = http_client.get(url, params=params, timeout=8)
         if r.status_code == 200:
             return r.json()
-        print(f"[ERROR] Failed to fetch recipe info ({r.status_code}): {r.text}")
+        log.error("Failed to fetch recipe info (%s): %s", r.status_code, r.text,
+                  extra={"provider": "spoonacular", "status": r.status_code, "recipe_id": recipe_id})
     except requests.RequestException as e:
-        print(f"[ERROR] Spoonacular recipe info failed: {e}")
+        log.error("Spoonacular recipe info failed: %s", e, extra={"provider": "spoonacular", "recipe_id": recipe_id})
     return None
 
 
+# Spoonacular accepts a comma separated id list, keep each call reasonably small
+BULK_CHUNK_SIZE = 50
+BULK_MAX_WORKERS = 4
+
+
+def get_recipes_bulk(ids, source="spoonacular"):
+    """
+    Fetch details for many recipes of one source at once.
+    Cached entries are used directly, the rest are requested through
+    /recipes/informationBulk in chunks that run concurrently (TheMealDB has
+    no bulk lookup, so its ids are looked up one by one, also concurrently).
+    Returns a dict {recipe_id: Recipe}; ids that could not be fetched are left out.
+    """
+    if source != "spoonacular":
+        ids = list(dict.fromkeys(ids))
+        fetch = in_current_context(lambda rid: get_recipe(rid, source))
+        with ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS) as executor:
+            recipes = executor.map(fetch, ids)
+        return {rid: recipe for rid, recipe in zip(ids, recipes) if recipe is not None}
+
+    found = {}
+    missing = []
+    for rid in dict.fromkeys(ids):
+        recipe = recipe_cache.get(_cache_key(source, rid))
+        if recipe is not None:
+            found[rid] = recipe
+        else:
+            missing.append(rid)
+
+    if not missing:
+        return found
+
+    chunks = [missing[i:i + BULK_CHUNK_SIZE] for i in range(0, len(missing), BULK_CHUNK_SIZE)]
+    if len(chunks) == 1:
+        fetched = [_fetch_recipe_info_bulk(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(BULK_MAX_WORKERS, len(chunks))) as executor:
+            fetched = list(executor.map(in_current_context(_fetch_recipe_info_bulk), chunks))
+
+    by_id = {}
+    for infos in fetched:
+        for info in infos:
+            by_id[str(info.get("id"))] = info
+    _remember(by_id.values())
+
+    for rid in missing:
+        info = by_id.get(str(rid))
+        if info is not None:
+            recipe = Recipe.from_spoonacular(info)
+            recipe_cache.set(_cache_key(source, rid), recipe)
+            found[rid] = recipe
+    return found
+
+
+def get_recipe_info_bulk(ids, source="spoonacular"):
+    """Like get_recipes_bulk, with Spoonacular-shaped dicts as values."""
+    return {rid: recipe.to_info() for rid, recipe in get_recipes_bulk(ids, source).items()}
+
+
+def _fetch_recipe_info_bulk(ids):
+    url = "https://api.spoonacular.com/recipes/informationBulk"
+    params = {
+        "ids": ",".join(str(i) for i in ids),
+        "includeNutrition": True,
+        "apiKey": API_KEY
+    }
+    try:
+        r = http_client.get(url, params=params, timeout=8)
+        if r.status_code == 200:
+            return r.json()
+        log.error("Failed to fetch recipe info bulk (%s): %s", r.status_code, r.text,
+                  extra={"provider": "spoonacular", "status": r.status_code})
+    except requests.RequestException as e:
+        log.error("Spoonacular recipe info bulk failed: %s", e, extra={"provider": "spoonacular"})
+    return []
+
+
 def matches_diet(info, selected):
     tags = {
         "vegetarian": info.get("vegetarian", False),
@@ -92,44 +280,84 @@ def matches_diet(info, selected):
 # Fallback: TheMealDB
 # ------------------------------
 
-def fallback_themealdb(query):
-    print("[INFO] Using TheMealDB fallback...")
+MEALDB_URL = "https://www.themealdb.com/api/json/v1/1"
+# filter.php takes one ingredient per call; only the first few are queried
+MEALDB_MAX_INGREDIENTS = max(int(os.getenv("MEALDB_MAX_INGREDIENTS", 3)), 1)
+_mealdb_executor = ThreadPoolExecutor(max_workers=MEALDB_MAX_INGREDIENTS, thread_name_prefix="mealdb-filter")
+
+
+def mealdb_by_ingredients(ingredients, number=10):
+    """
+    TheMealDB search by ingredient: one filter.php?i= call per ingredient
+    (at most MEALDB_MAX_INGREDIENTS), intersected so meals matching more of
+    the ingredients come first. Returns findByIngredients-shaped hits.
+    """
+    names = list(dict.fromkeys(
+        n for n in (normalize_ingredient(i) for i in ingredients) if n
+    ))[:MEALDB_MAX_INGREDIENTS]
+    if not names:
+        return []
+
+    matches = {}
+    for meals in _mealdb_executor.map(in_current_context(_mealdb_filter), names):
+        for meal in meals:
+            entry = matches.setdefault(meal["idMeal"], [meal, 0])
+            entry[1] += 1
+
+    ranked = sorted(matches.values(), key=lambda m: -m[1])[:number]
+    return [
+        {
+            "id":                    int(meal["idMeal"]) if meal["idMeal"].isdigit() else meal["idMeal"],
+            "title":                 meal.get("strMeal", "Untitled"),
+            "image":                 meal.get("strMealThumb"),
+            "source":                "mealdb",
+            "usedIngredientCount":   used,
+            # filter.php doesn't tell what else the meal needs
+            "missedIngredientCount": None,
+        }
+        for meal, used in ranked
+    ]
+
+
+def _mealdb_filter(ingredient):
     try:
-        url = f"https://www.themealdb.com/api/json/v1/1/search.php?s={query}"
-        r = requests.get(url, timeout=5)
+        r = http_client.get(f"{MEALDB_URL}/filter.php", params={"i": ingredient.replace(" ", "_")},
+                            timeout=MEALDB_DEADLINE, retries=0)
         if r.status_code == 200:
-            data = r.json()
-            meals = data.get("meals", [])
-            return [convert_mealdb_recipe(meal) for meal in meals if meal]
-        else:
-            print(f"[ERROR] TheMealDB error: {r.status_code}")
+            return r.json().get("meals") or []
+        log.error("TheMealDB filter error: %s", r.status_code, extra={"provider": "mealdb", "status": r.status_code})
     except Exception as e:
-        print("[ERROR] TheMealDB fallback failed:", e)
+        log.error("TheMealDB filter failed: %s", e, extra={"provider": "mealdb"})
     return []
 
 
-def convert_mealdb_recipe(meal):
-    steps = meal.get("strInstructions", "")
-    ingredients = []
-    for i in range(1, 21):
-        ing = meal.get(f"strIngredient{i}")
-        if ing and ing.strip():
-            ingredients.append({"original": ing})
-
-    return {
-        "id": meal.get("idMeal"),
-        "title": meal.get("strMeal", "Untitled"),
-        "image": meal.get("strMealThumb"),
-        "summary": steps,
-        "sourceUrl": meal.get("strSource", ""),
-        "readyInMinutes": 30,
-        "servings": 1,
-        "extendedIngredients": ingredients,
-        "analyzedInstructions": [{
-            "name": "Steps",
-            "steps": [
-                {"number": idx + 1, "step": s.strip()}
-                for idx, s in enumerate(steps.split(". ")) if s.strip()
-            ]
-        }]
-    }
+def _mealdb_recipe(meal_id):
+    try:
+        r = http_client.get(f"{MEALDB_URL}/lookup.php", params={"i": meal_id}, timeout=5)
+        if r.status_code == 200:
+            meals = r.json().get("meals") or []
+            return Recipe.from_mealdb(meals[0]) if meals else None
+        log.error("TheMealDB lookup error: %s", r.status_code,
+                  extra={"provider": "mealdb", "status": r.status_code, "recipe_id": meal_id})
+    except Exception as e:
+        log.error("TheMealDB lookup failed: %s", e, extra={"provider": "mealdb", "recipe_id": meal_id})
+    return None
+
+
+# Detail lookup per source: recipe id -> Recipe or None
+_DETAIL_FETCHERS = {
+    "spoonacular": _spoonacular_recipe,
+    "mealdb":      _mealdb_recipe,
+}
+SOURCES = tuple(_DETAIL_FETCHERS)
+
+
+# ------------------------------
+# Search engine wiring
+# ------------------------------
+_providers = [
+    Provider("mealdb", mealdb_by_ingredients, deadline=MEALDB_DEADLINE, priority=1),
+]
+if SPOONACULAR_ENABLED:
+    _providers.append(Provider("spoonacular", _spoonacular_search, deadline=SPOONACULAR_DEADLINE, priority=0))
+_search_engine = SearchEngine(_providers, rank=_rank_results, unbeatable=_is_unbeatable)
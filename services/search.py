@@ -1,16 +1,24 @@
 # services/search.py
 
+import logging
 import os
-import random
-import requests
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-from services.recipes import find_by_ingredients, get_recipe_info, matches_diet
+from services import http_client
+from services.recipes import (
+    find_by_ingredients, stream_by_ingredients, get_recipe, get_recipe_info,
+    get_recipes_bulk, get_recipe_info_bulk, matches_diet, SOURCES
+)
 
 load_dotenv()
 API_KEY    = os.getenv("SPOONACULAR_API_KEY")
 MEALDB_URL = "https://www.themealdb.com/api/json/v1/1"
 
+log = logging.getLogger(__name__)
+
 def get_random_recipes(number=5):
     """
     Fetch up to `number` random recipes:
@@ -22,7 +30,7 @@ def get_random_recipes(number=5):
 
     # 1) Spoonacular random endpoint
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://api.spoonacular.com/recipes/random",
             params={"apiKey": API_KEY, "number": number},
             timeout=8
@@ -37,26 +45,107 @@ def get_random_recipes(number=5):
         pass
 
     # 2) Fallback: MealDB
-    while len(results) < number:
-        try:
-            resp = requests.get(f"{MEALDB_URL}/random.php", timeout=5)
-            resp.raise_for_status()
-            meals = resp.json().get("meals") or []
-            if not meals:
-                continue
-            m = meals[0]
-            # normalize minimal fields
-            results.append({
-                "id":            int(m["idMeal"]),
-                "title":         m["strMeal"],
-                "image":         m["strMealThumb"],
-                "source":        "mealdb"
-            })
-        except Exception:
-            break
+    if len(results) < number:
+        results.extend(_mealdb_random(number - len(results)))
 
     return results[:number]
 
+
+# ------------------------------
+# MealDB random backfill
+# ------------------------------
+# Up to this many random.php calls per meal we still need (duplicates happen)
+MEALDB_ATTEMPTS_PER_MEAL = 2
+MEALDB_MAX_PARALLEL = 6
+RESERVOIR_SIZE = int(os.getenv("MEALDB_RESERVOIR_SIZE", 48))
+
+_reservoir = deque(maxlen=RESERVOIR_SIZE)
+_reservoir_lock = threading.Lock()
+# held for the whole refill; taken with acquire(blocking=False) so only one runs
+_refill_lock = threading.Lock()
+_mealdb_executor = ThreadPoolExecutor(max_workers=MEALDB_MAX_PARALLEL, thread_name_prefix="mealdb")
+
+
+def _fetch_random_meal():
+    try:
+        resp = http_client.get(f"{MEALDB_URL}/random.php", timeout=5)
+        resp.raise_for_status()
+        meals = resp.json().get("meals") or []
+    except Exception as e:
+        log.warning("MealDB random.php failed: %s", e)
+        return None
+    if not meals:
+        return None
+    m = meals[0]
+    # normalize minimal fields
+    return {
+        "id":            int(m["idMeal"]),
+        "title":         m["strMeal"],
+        "image":         m["strMealThumb"],
+        "source":        "mealdb"
+    }
+
+
+def _fetch_random_meals(attempts):
+    """Issue `attempts` random.php calls in parallel; failed calls are dropped."""
+    futures = [_mealdb_executor.submit(_fetch_random_meal) for _ in range(attempts)]
+    return [m for m in (f.result() for f in futures) if m]
+
+
+def _refill_reservoir():
+    try:
+        missing = RESERVOIR_SIZE - len(_reservoir)
+        if missing > 0:
+            meals = _fetch_random_meals(min(missing, MEALDB_MAX_PARALLEL * 2))
+            with _reservoir_lock:
+                known = {m["id"] for m in _reservoir}
+                for m in meals:
+                    if m["id"] not in known:
+                        known.add(m["id"])
+                        _reservoir.append(m)
+    finally:
+        _refill_lock.release()
+
+
+def _mealdb_random(count):
+    """
+    `count` distinct random MealDB meals: taken from the local reservoir first,
+    the rest fetched concurrently within an attempt budget. Extras go back
+    into the reservoir, which is topped up in the background once it runs low.
+    """
+    picked = {}
+    with _reservoir_lock:
+        while _reservoir and len(picked) < count:
+            m = _reservoir.popleft()
+            picked.setdefault(m["id"], m)
+
+    budget = count * MEALDB_ATTEMPTS_PER_MEAL
+    while len(picked) < count and budget > 0:
+        attempts = min(count - len(picked), budget)
+        budget -= attempts
+        meals = _fetch_random_meals(attempts)
+        if not meals:
+            break
+        extras = []
+        for m in meals:
+            if m["id"] in picked:
+                continue
+            if len(picked) < count:
+                picked[m["id"]] = m
+            else:
+                extras.append(m)
+        with _reservoir_lock:
+            _reservoir.extend(extras)
+
+    if len(_reservoir) < RESERVOIR_SIZE // 2 and _refill_lock.acquire(blocking=False):
+        try:
+            _mealdb_executor.submit(_refill_reservoir)
+        except RuntimeError:  # executor shut down at exit
+            _refill_lock.release()
+
+    return list(picked.values())
+
+
 def matches_diet(recipe, selected_diets):
     if not selected_diets:
         return True
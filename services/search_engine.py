@@ -0,0 +1,172 @@
+# services/search_engine.py
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.metrics import in_current_context
+
+log = logging.getLogger(__name__)
+
+
+class Provider:
+    """
+    A recipe source the engine can query.
+    `fetch(ingredients, number)` is a blocking call returning a list of recipes;
+    `deadline` is the max seconds we wait for it; lower `priority` ranks first.
+    """
+
+    def __init__(self, name, fetch, deadline=8.0, priority=0):
+        self.name = name
+        self.fetch = fetch
+        self.deadline = deadline
+        self.priority = priority
+
+
+class SearchEngine:
+    """
+    Queries every provider concurrently on one shared event loop.
+
+    `rank(ingredients, batches, number)` merges the answered providers' result
+    lists (best provider first). A ranking can put any provider's hits on top,
+    so with one set the engine waits for every provider (each bounded by its
+    deadline), unless `unbeatable(ingredients, hit)` is given and the top
+    `number` hits of the providers ahead of the rest all pass it: nothing a
+    later provider answers can displace those. Without a ranking, the lists
+    are concatenated in provider order, and the engine returns as soon as that
+    order is settled: once the providers ahead of the rest have answered and
+    already fill `number`, whatever is still pending is cancelled.
+
+    Each provider's blocking calls run on its own pool of `max_workers`
+    threads, so calls that hang past their deadline only hold up later
+    searches of that provider.
+    """
+
+    def __init__(self, providers, max_workers=4, rank=None, unbeatable=None):
+        self.providers = sorted(providers, key=lambda p: p.priority)
+        self.rank = rank
+        self.unbeatable = unbeatable
+        self._executors = {
+            p.name: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"search-{p.name}")
+            for p in self.providers
+        }
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    async def search(self, ingredients, number=10, fetches=None):
+        tasks = {
+            asyncio.ensure_future(self._query(p, ingredients, number, fetches)): p
+            for p in self.providers
+        }
+        answered = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    answered[tasks[task].name] = task.result()
+                if self._is_settled(answered, ingredients, number):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._rank(answered, ingredients, number)
+
+    async def stream(self, ingredients, number=10, fetches=None):
+        """Yield (provider name, results) for each provider as soon as it answers."""
+        tasks = {
+            asyncio.ensure_future(self._query(p, ingredients, number, fetches)): p
+            for p in self.providers
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: tasks[t].priority):
+                    yield tasks[task].name, task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _query(self, provider, ingredients, number, fetches=None):
+        # `fetches` are the providers' fetch functions bound to the caller's context
+        fetch = (fetches or {}).get(provider.name, provider.fetch)
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(self._executors[provider.name], fetch, ingredients, number)
+        try:
+            return await asyncio.wait_for(call, provider.deadline) or []
+        except asyncio.TimeoutError:
+            log.warning("%s missed its %ss deadline", provider.name, provider.deadline,
+                        extra={"provider": provider.name})
+        except Exception:
+            log.exception("%s failed", provider.name, extra={"provider": provider.name})
+        return []
+
+    def _answered_prefix(self, answered):
+        # result lists of the providers that answered before any still pending
+        batches = []
+        for p in self.providers:
+            if p.name not in answered:
+                break
+            batches.append(answered[p.name])
+        return batches
+
+    def _is_settled(self, answered, ingredients, number):
+        batches = self._answered_prefix(answered)
+        if self.rank is None:
+            return sum(len(results) for results in batches) >= number
+        if self.unbeatable is None:
+            return False
+        top = self.rank(ingredients, batches, number)
+        return len(top) >= number and all(self.unbeatable(ingredients, hit) for hit in top)
+
+    def _rank(self, answered, ingredients, number):
+        batches = [answered[p.name] for p in self.providers if p.name in answered]
+        if self.rank is not None:
+            return self.rank(ingredients, batches, number)
+        return [hit for results in batches for hit in results][:number]
+
+    # ---- sync shim for Flask views and Tk callbacks ----
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="search-loop", daemon=True).start()
+            return self._loop
+
+    def _caller_fetches(self):
+        # must run on the calling thread: that is the context (request trace) captured
+        return {p.name: in_current_context(p.fetch) for p in self.providers}
+
+    def run(self, coro):
+        """Run a coroutine on the engine's loop from any non-async thread and wait for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def search_sync(self, ingredients, number=10):
+        return self.run(self.search(ingredients, number, fetches=self._caller_fetches()))
+
+    def stream_sync(self, ingredients, number=10):
+        """Blocking generator over stream(); closing it cancels the remaining providers."""
+        items = queue.Queue()
+        done = object()
+
+        fetches = self._caller_fetches()
+
+        async def pump():
+            try:
+                async for item in self.stream(ingredients, number, fetches):
+                    items.put(item)
+            finally:
+                items.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._ensure_loop())
+        try:
+            while True:
+                item = items.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            future.cancel()
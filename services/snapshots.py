@@ -0,0 +1,107 @@
+# services/snapshots.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from models import db, SavedRecipe
+from services.cache import make_cache
+from services.recipes import get_recipes_bulk
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_MAX_AGE = timedelta(days=int(os.getenv("SNAPSHOT_MAX_AGE_DAYS", 7)))
+SNAPSHOT_REFRESH_INTERVAL = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL", 3600))
+
+# shared by every worker: whoever holds the lease runs the refresh
+_leases = make_cache("leases", maxsize=8, ttl=SNAPSHOT_REFRESH_INTERVAL, front_ttl=1)
+
+_DIET_FLAGS = {
+    "vegetarian": "vegetarian",
+    "vegan": "vegan",
+    "glutenFree": "gluten free",
+    "dairyFree": "dairy free",
+    "ketogenic": "ketogenic",
+}
+
+
+def card_snapshot(recipe):
+    """The few fields a recipe card needs, taken from a Recipe."""
+    diets = set(recipe.diets)
+    diets.update(_DIET_FLAGS[flag] for flag in recipe.flags if flag in _DIET_FLAGS)
+    return {
+        "title":            recipe.title[:200],
+        "image":            recipe.image,
+        "ready_in_minutes": recipe.ready_in_minutes,
+        "servings":         recipe.servings,
+        "diets":            sorted(diets),
+        "snapshot_at":      datetime.utcnow(),
+    }
+
+
+def refresh_stale_snapshots(max_age=SNAPSHOT_MAX_AGE, limit=200):
+    """
+    Re-fetch card data for saved recipes whose snapshot is missing or older
+    than `max_age`. Returns the number of rows updated.
+    Must run inside an app context.
+
+    Rows never tried come first, then the ones tried longest ago. Every
+    attempt is recorded, so rows that keep failing move to the back instead
+    of taking the same `limit` slots on every run.
+    """
+    now = datetime.utcnow()
+    cutoff = now - max_age
+    stale = SavedRecipe.query.filter(
+        SavedRecipe.api_source == "spoonacular",
+        db.or_(SavedRecipe.snapshot_at.is_(None), SavedRecipe.snapshot_at < cutoff)
+    ).order_by(
+        SavedRecipe.snapshot_tried_at.asc().nullsfirst(),
+        SavedRecipe.snapshot_at.asc().nullsfirst(),
+    ).limit(limit).all()
+    if not stale:
+        return 0
+
+    recipes = get_recipes_bulk([row.recipe_id for row in stale])
+    updated = 0
+    for row in stale:
+        row.snapshot_tried_at = now
+        recipe = recipes.get(row.recipe_id)
+        if recipe:
+            row.apply_snapshot(card_snapshot(recipe))
+            updated += 1
+    db.session.commit()
+    return updated
+
+
+def start_snapshot_refresher(app, interval=SNAPSHOT_REFRESH_INTERVAL):
+    """
+    Runs refresh_stale_snapshots() every `interval` seconds on a daemon thread.
+    Every worker starts one, but a run only goes ahead in the worker that takes
+    the shared lease, so there is one refresh per interval across workers.
+    """
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+
+    def loop():
+        # first pass shortly after startup, then every `interval` seconds
+        delay = min(interval, 30)
+        while not stop.wait(delay):
+            delay = interval
+            # a little under the interval, so the same worker can take it again next time
+            if not _leases.add("snapshot-refresh", os.getpid(), ttl=max(interval - 5, 1)):
+                continue
+            with app.app_context():
+                try:
+                    count = refresh_stale_snapshots()
+                    if count:
+                        log.info("Refreshed %d saved recipe snapshots.", count)
+                except Exception:
+                    db.session.rollback()
+                    log.exception("Snapshot refresh failed")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=loop, name="snapshot-refresher", daemon=True)
+    thread.start()
+    return stop
@@ -0,0 +1,125 @@
+# services/standin.py
+"""
+Local stand-in for the upstream recipe APIs, serving recorded fixtures.
+
+    python -m services.standin --port 8765 --latency 120 --jitter 40 --error-rate 0.05
+
+then run the app with HTTP_STANDIN_URL=http://127.0.0.1:8765. Requests
+arrive as /<upstream host>/<path>?<query> (see HttpClient._route).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from services.fixtures import FixtureStore, FIXTURES_DIR, canonical_request
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Serves fixtures from `store`, waiting `latency` ± `jitter` seconds per
+    request and answering `error_status` to an `error_rate` share of them.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, store, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+        super().__init__(address, StandinHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.served = 0
+        self.missing = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self):
+        with self._random_lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self._random_lock:
+            return self.random.random() < self.error_rate
+
+    def start(self):
+        """Serve on a daemon thread; returns the thread. Stop with shutdown()."""
+        thread = threading.Thread(target=self.serve_forever, name="standin", daemon=True)
+        thread.start()
+        return thread
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "RecipeStandin/1.0"
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.delay())
+        if server.should_fail():
+            return self._send(server.error_status, b'{"message":"injected failure"}')
+
+        # /<host>/<path>?<query> -> https://<host>/<path>?<query>
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        url = f"https://{host}/{path}" + (f"?{parts.query}" if parts.query else "")
+        fixture = server.store.load("GET", url)
+        if fixture is None:
+            server.missing += 1
+            body = json.dumps({"message": f"no fixture for {canonical_request('GET', url)}"}).encode("utf-8")
+            return self._send(404, body)
+
+        server.served += 1
+        self._send(fixture.get("status", 200), FixtureStore.body(fixture), fixture.get("headers"))
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        headers = dict(headers or {})
+        headers.setdefault("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # one line per request is too chatty under load
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded upstream responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture directory")
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency per request, in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter, in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = StandinServer(
+        (args.host, args.port), FixtureStore(args.fixtures),
+        latency=args.latency / 1000, jitter=args.jitter / 1000,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+    )
+    print(f"[INFO] Stand-in serving {args.fixtures} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
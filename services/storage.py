@@ -1,4 +1,5 @@
 #data/storage.py
+import logging
 import os
 import json
 
@@ -9,6 +10,8 @@ HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
 FAVORITES_FILE = os.path.join(DATA_DIR, "favorites.json")
 MEALPLAN_FILE = os.path.join(DATA_DIR, "mealplan.json")
 
+log = logging.getLogger(__name__)
+
 # Ensure data_files folder exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
@@ -22,11 +25,11 @@ def load_json(path, default):
                     return [data]
                 # Reject wrong types
                 if not isinstance(data, type(default)):
-                    print(f"[WARNING] Unexpected format in {path}, resetting.")
+                    log.warning("Unexpected format in %s, resetting.", path)
                     return default
                 return data
     except json.JSONDecodeError as e:
-        print(f"[ERROR] Failed to parse JSON from {path}: {e}")
+        log.error("Failed to parse JSON from %s: %s", path, e)
     return default
 
 def save_json(path, data):
@@ -0,0 +1,119 @@
+# services/tools.py
+import json
+import logging
+import os
+from collections import deque
+
+from services.cache import LRUCache
+from services.recipe_model import Recipe
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_MAP_PATH = os.path.join(BASE_DIR, "data", "tools_map.json")
+
+
+def _words(text):
+    return " ".join(text.lower().split())
+
+
+class ToolMatcher:
+    """
+    Finds kitchen tool names in recipe text in a single pass.
+
+    The tool names are compiled once into an Aho–Corasick automaton, so a scan
+    costs O(text + matches) however many tools there are. A hit only counts on
+    word boundaries: "pan" is found in "a large pan," but not in "pancakes".
+    """
+
+    def __init__(self, tool_map):
+        self.tool_map = dict(tool_map)
+        self._order = {tool: i for i, tool in enumerate(self.tool_map)}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for tool in self.tool_map:
+            key = _words(tool)
+            if key:
+                self._insert(key, tool)
+        self._link()
+
+    def _insert(self, key, tool):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((tool, len(key)))
+
+    def _link(self):
+        # breadth-first, so a state's fail link is resolved before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """{tool: url} for every tool mentioned in `text`, in tools_map order."""
+        text = _words(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            if i + 1 < len(text) and text[i + 1].isalnum():
+                continue
+            for tool, length in out[state]:
+                start = i - length + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    found.add(tool)
+        return {tool: self.tool_map[tool] for tool in sorted(found, key=self._order.get)}
+
+
+def load_tool_map(path=TOOLS_MAP_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        log.error("Couldn't load tools map %s: %s", path, e)
+        return {}
+
+
+matcher = ToolMatcher(load_tool_map())
+# tools per (source, recipe id); the map is static, so entries never go stale
+_memo = LRUCache(maxsize=2048, ttl=float("inf"))
+
+
+def detect_tools(recipe):
+    """
+    {tool: shop link} for the tools a recipe's summary and steps mention.
+    Takes a Recipe or a Spoonacular/MealDB-shaped dict.
+    """
+    if isinstance(recipe, dict):
+        recipe = Recipe.from_info(recipe)
+
+    key = (recipe.source, recipe.id) if recipe.id is not None else None
+    if key is not None:
+        tools = _memo.get(key)
+        if tools is not None:
+            return dict(tools)
+
+    tools = matcher.find(recipe.summary + " " + " ".join(recipe.steps))
+    if key is not None:
+        _memo.set(key, tools)
+    return dict(tools)
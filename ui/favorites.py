@@ -3,13 +3,15 @@ import tkinter as tk
 import tkinter.messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from services.recipes import get_recipe_info
+from services.recipes import get_recipe_info, get_recipe_info_bulk
+from ui.tasks import get_scheduler
 
 
 class FavoritesPanel:
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
+        self.details = {}
         self.setup_ui()
 
     def setup_ui(self):
@@ -20,6 +22,13 @@ class FavoritesPanel:
             ttk.Label(frame, text=self.app.tr("no_favorites"), font=("Segoe UI", 16)).pack(pady=20)
             return
 
+        # one bulk request for the whole list instead of one per "View" click,
+        # in the background so the list shows up straight away
+        get_scheduler(self.app.root).submit(
+            get_recipe_info_bulk, [fav['id'] for fav in self.app.favorites],
+            on_done=self.details.update, owner=frame
+        )
+
         for fav in self.app.favorites:
             self.create_favorite_entry(frame, fav)
 
@@ -34,10 +43,25 @@ class FavoritesPanel:
         ttk.Button(fav_frame, text=self.app.tr("remove"), bootstyle="danger", command=lambda: self.remove_favorite(fav)).pack(side="right")
 
     def view_favorite_recipe(self, fav):
-        recipe = get_recipe_info(fav['id'])
+        recipe = self.details.get(fav['id'])
+        if recipe:
+            self.show_recipe(fav, recipe)
+            return
+
+        self.app.clear_main()
+        placeholder = ttk.Label(self.app.main, text=self.app.tr("loading"), font=("Segoe UI", 14))
+        placeholder.pack(pady=20)
+        get_scheduler(self.app.root).submit(
+            get_recipe_info, fav['id'],
+            on_done=lambda info: self.show_recipe(fav, info),
+            on_error=lambda e: self.show_recipe(fav, None),
+            owner=placeholder
+        )
 
+    def show_recipe(self, fav, recipe):
         if not recipe:
             tk.messagebox.showwarning(self.app.tr("not_found"), "This recipe is no longer available.")
+            self.app.show_favorites()
             return
 
         self.app.clear_main()
@@ -0,0 +1,168 @@
+#ui/images.py
+import hashlib
+import io
+import logging
+import os
+
+from PIL import Image, ImageTk
+
+from services import http_client
+from services.cache import LRUCache
+from services.storage import DATA_DIR
+from ui.tasks import TaskScheduler
+
+log = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = os.path.join(DATA_DIR, "thumbnails")
+THUMBNAIL_SIZE = (300, 300)
+# decoded PhotoImages kept in memory
+MEMORY_ITEMS = int(os.getenv("THUMBNAIL_MEMORY_ITEMS", 64))
+# files kept on disk; the oldest are removed past this
+DISK_ITEMS = int(os.getenv("THUMBNAIL_DISK_ITEMS", 500))
+# prune the disk cache after this many new files
+PRUNE_EVERY = 50
+
+
+class ImageLoader:
+    """
+    Loads recipe pictures without blocking the Tk main loop.
+
+    Download, decode and thumbnailing run as tasks on the loader's own
+    TaskScheduler, so navigating away (which cancels the app's tasks) doesn't
+    drop fetches other tabs wait for; the results are turned into PhotoImages
+    on the main thread, which Tk requires. Thumbnails are kept in an in-memory
+    LRU and in an on-disk cache keyed by URL, so a recipe opened again shows
+    its picture at once.
+    """
+
+    def __init__(self, root, max_workers=4, memory_items=MEMORY_ITEMS, disk_dir=THUMBNAIL_DIR,
+                 disk_items=DISK_ITEMS):
+        self.root = root
+        self.disk_dir = disk_dir
+        self.disk_items = disk_items
+        self._photos = LRUCache(maxsize=memory_items, ttl=float("inf"))
+        self._tasks = TaskScheduler(root, max_workers=max_workers, name="thumbnails")
+        self._waiting = {}  # (url, size) -> [callbacks]; main thread only
+        self._writes = 0
+        os.makedirs(disk_dir, exist_ok=True)
+
+    def load(self, url, callback, size=THUMBNAIL_SIZE):
+        """
+        Calls `callback(photo)` on the main thread once the picture is ready,
+        or `callback(None)` if it can't be loaded. Must be called from the main
+        thread. Returns a function that cancels the callback.
+        """
+        key = (url, tuple(size))
+        photo = self._photos.get(key)
+        if photo is not None:
+            callback(photo)
+            return lambda: None
+
+        callbacks = self._waiting.get(key)
+        if callbacks is None:
+            callbacks = self._waiting[key] = []
+            self._tasks.submit(
+                self._fetch, key,
+                on_done=lambda result: self._deliver(key, *result),
+                on_error=lambda e: self._failed(key, e),
+            )
+        callbacks.append(callback)
+
+        def cancel():
+            if callback in self._waiting.get(key, ()):
+                self._waiting[key].remove(callback)
+        return cancel
+
+    # ---- worker side ----
+
+    def _fetch(self, key):
+        """(image, whether a new thumbnail file was written)."""
+        url, size = key
+        image = self._from_disk(url, size)
+        if image is not None:
+            return image, False
+        resp = http_client.get(url, timeout=5)
+        resp.raise_for_status()
+        image = Image.open(io.BytesIO(resp.content))
+        image.thumbnail(size)
+        image = image.convert("RGB")
+        return image, self._to_disk(url, size, image)
+
+    def _path(self, url, size):
+        digest = hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.jpg")
+
+    def _from_disk(self, url, size):
+        path = self._path(url, size)
+        try:
+            with Image.open(path) as image:
+                image.load()
+                os.utime(path)  # recently used, so pruned last
+                return image.copy()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning("Dropping unreadable thumbnail %s: %s", path, e)
+            os.remove(path)
+            return None
+
+    def _to_disk(self, url, size, image):
+        path = self._path(url, size)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            image.save(tmp, "JPEG", quality=85)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("Couldn't cache thumbnail for %s: %s", url, e)
+            return False
+        return True
+
+    def _prune(self):
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".jpg")]
+        except OSError:
+            return
+        if len(files) <= self.disk_items:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for entry in files[:len(files) - self.disk_items]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    # ---- main thread side ----
+
+    def _deliver(self, key, image, written=False):
+        if written:
+            # counted here rather than in the workers, so no lock is needed
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._tasks.submit(self._prune)
+        photo = None
+        if image is not None:
+            photo = ImageTk.PhotoImage(image, master=self.root)
+            self._photos.set(key, photo)
+        for callback in self._waiting.pop(key, []):
+            try:
+                callback(photo)
+            except Exception:
+                log.exception("Image callback failed")
+
+    def _failed(self, key, error):
+        log.warning("Couldn't load image %s: %s", key[0], error)
+        self._deliver(key, None)
+
+    def shutdown(self):
+        self._tasks.shutdown()
+
+
+_loader = None
+
+
+def get_image_loader(root):
+    """The loader shared by every recipe tab of this Tk app."""
+    global _loader
+    if _loader is None:
+        _loader = ImageLoader(root)
+    return _loader
@@ -4,6 +4,7 @@ from services.search import show_search
 from ui.favorites import show_favorites
 from ui.history import show_history
 from ui.meal_planner import show_meal_planner
+from ui.tasks import get_scheduler
 
 def setup_layout(app):
     sidebar = ttk.Frame(app.root, width=150)
@@ -18,6 +19,8 @@ def setup_layout(app):
     ttk.Button(sidebar, text="🗓️ Meal Planner", bootstyle="primary", command=lambda: app.show_meal_planner()).pack(fill="x", pady=5)
 
     def clear_main():
+        # navigating away: whatever the old view was waiting for is no longer wanted
+        get_scheduler(app.root).cancel_all()
         for widget in main.winfo_children():
             widget.destroy()
 
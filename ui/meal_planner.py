@@ -1,4 +1,6 @@
 #ui/meal_planner.py
+import logging
+import math
 import os
 import tkinter as tk
 import ttkbootstrap as ttk
@@ -10,11 +12,13 @@ from fpdf import FPDF
 from openpyxl import Workbook
 
 from services.storage import get_mealplan, save_mealplan
-from services.recipes import get_recipe_info
-from collections import defaultdict
-from data.ingredient_map import normalization_map
+from services.recipes import get_recipe_info, get_recipe_info_bulk
+from services.quantities import aggregate_ingredients
+from services.nutrition_rollup import NutrientId, nutrient_key, plan_rollup
+from data.settings import load_settings
+from ui.tasks import get_scheduler
 
-import re
+log = logging.getLogger(__name__)
 
 
 class MealPlannerPanel:
@@ -64,7 +68,7 @@ class MealPlannerPanel:
                     recipe_id = matched.get("id")
                     label = ttk.Label(grid_frame, text=title, cursor="hand2", wraplength=140, justify="left")
                     label.grid(row=row, column=col, padx=4, pady=4, sticky="w")
-                    label.bind("<Button-1>", lambda e, rid=recipe_id, url=url: self.open_recipe(rid, url))
+                    label.bind("<Button-1>", lambda e, rid=recipe_id, url=url: self.open_recipe(rid, url, e.widget))
                     self.entries[(day, meal)] = label
                 else:
                     entry = ttk.Entry(grid_frame, width=22)
@@ -80,22 +84,33 @@ class MealPlannerPanel:
         ttk.Button(btn_frame, text=self.app.tr("save_all"), bootstyle="success", command=self.save_all).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="➕ Add Meal", bootstyle="primary", command=self.prompt_add_meal).pack(side="left", padx=5)
         ttk.Button(btn_frame, text=self.app.tr("shopping_list"), bootstyle="info", command=self.show_shopping_list).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="📊 " + self.app.tr("nutrition_totals"), bootstyle="info", command=self.show_nutrition).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="❌ Clear Planner", bootstyle="danger", command=self.clear_planner).pack(side="left", padx=5)
 
-    def open_recipe(self, rid, url):
+    def open_recipe(self, rid, url, label=None):
         if not hasattr(self.app, 'open_recipe'):
-            print('[MealPlanner] ERROR: app has no open_recipe method')
+            log.error("App has no open_recipe method, can't open recipe %s", rid)
             return
-        full = get_recipe_info(rid)
-        if full:
-            for entry in self.mealplan:
-                if entry.get("id") == rid:
-                    entry["ingredients"] = [i["original"] for i in full.get("extendedIngredients", []) if "original" in i]
-                    break
-            save_mealplan(self.mealplan)
-            self.app.open_recipe(full, show_close=True)
-        elif url:
-            webbrowser.open(url)
+        if label is not None:
+            title = label.cget("text")
+            label.configure(text=self.app.tr("loading"), cursor="watch")
+
+        def done(full):
+            if label is not None:
+                label.configure(text=title, cursor="hand2")
+            if full:
+                for entry in self.mealplan:
+                    if entry.get("id") == rid:
+                        self.store_ingredients(entry, full)
+                        break
+                save_mealplan(self.mealplan)
+                self.app.open_recipe(full, show_close=True)
+            elif url:
+                webbrowser.open(url)
+
+        get_scheduler(self.app.root).submit(
+            get_recipe_info, rid, on_done=done, on_error=lambda e: done(None), owner=label
+        )
 
     def save_meal(self, day, meal, title):
         if not title:
@@ -137,17 +152,48 @@ class MealPlannerPanel:
             entry.insert(0, title)
             self.save_meal(day, meal, title)
 
+    @staticmethod
+    def store_ingredients(entry, full):
+        extended = [i for i in full.get("extendedIngredients", []) if "original" in i]
+        entry["ingredients"] = [i["original"] for i in extended]
+        # structured amounts let the shopping list add quantities up
+        entry["ingredient_details"] = [
+            {key: i.get(key) for key in ("original", "name", "amount", "unit")}
+            for i in extended
+        ]
+
+    def fetch_missing_ingredients(self, then):
+        """Fills in ingredients for planned recipes never opened, then calls `then()` on the main loop."""
+        missing = [e["id"] for e in self.mealplan if e.get("id") and "ingredient_details" not in e]
+        if not missing:
+            then()
+            return
+
+        def done(infos):
+            for entry in self.mealplan:
+                full = infos.get(entry.get("id"))
+                if full and "ingredient_details" not in entry:
+                    self.store_ingredients(entry, full)
+            save_mealplan(self.mealplan)
+            then()
+
+        get_scheduler(self.app.root).submit(
+            get_recipe_info_bulk, missing, on_done=done, on_error=lambda e: then(), owner=self.parent
+        )
+
     def show_shopping_list(self):
+        self.fetch_missing_ingredients(self.open_shopping_list)
+
+    def open_shopping_list(self):
         ingredients = []
         for entry in self.mealplan:
-            if "ingredients" in entry:
-                ingredients.extend(entry["ingredients"])
+            ingredients.extend(entry.get("ingredient_details") or entry.get("ingredients", []))
 
         if not ingredients:
             tk.messagebox.showinfo(self.app.tr("no_ingredients"), "No recipes with ingredients found. Try clicking recipe titles first.")
             return
 
-        grouped = self.simplify_ingredients(ingredients)
+        grouped = self.aggregate_ingredients(ingredients)
 
         popup = tk.Toplevel(self.parent)
         popup.title("\U0001F6D2 Shopping List")
@@ -175,6 +221,48 @@ class MealPlannerPanel:
             command=lambda: self.export_shopping_list(grouped)
         ).pack()
 
+    def show_nutrition(self):
+        targets = load_settings().get("nutrition_targets")
+        get_scheduler(self.app.root).submit(
+            plan_rollup, self.mealplan, targets,
+            on_done=self.open_nutrition,
+            on_error=lambda e: tk.messagebox.showerror(self.app.tr("error"), f"Could not load nutrition:\n{e}"),
+            owner=self.parent
+        )
+
+    def open_nutrition(self, rollup):
+        popup = tk.Toplevel(self.parent)
+        popup.title("\U0001F4CA " + self.app.tr("nutrition_totals"))
+        popup.geometry("900x420")
+
+        shown = [NutrientId.CALORIES, NutrientId.PROTEIN, NutrientId.FAT, NutrientId.CARBOHYDRATES,
+                 NutrientId.SUGAR, NutrientId.FIBER, NutrientId.SODIUM]
+        columns = ["day"] + [nutrient_key(nid) for nid in shown]
+        tree = ttk.Treeview(popup, columns=columns, show="headings")
+        tree.heading("day", text="")
+        tree.column("day", width=130, anchor="w")
+        for nid in shown:
+            tree.heading(nutrient_key(nid), text=f"{nid.name.replace('_', ' ').title()} ({rollup.units[nid]})")
+            tree.column(nutrient_key(nid), width=105, anchor="e")
+
+        def cells(totals, percent):
+            return [
+                f"{totals[nid]:.0f}" + ("" if math.isnan(percent[nid]) else f" ({percent[nid]:.0f}%)")
+                for nid in shown
+            ]
+
+        for week in range(rollup.weeks):
+            for day in range(7):
+                slot = week * 7 + day
+                label = self.days[day] if rollup.weeks == 1 else f"W{week + 1} {self.days[day]}"
+                tree.insert("", "end", values=[label] + cells(rollup.per_day[slot], rollup.per_day_dv[slot]))
+            tree.insert("", "end", values=[f"Week {week + 1}"] + cells(rollup.per_week[week], rollup.per_week_dv[week]))
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        if rollup.unresolved:
+            titles = ", ".join(e.get("title") or str(e.get("id", "?")) for e in rollup.unresolved)
+            ttk.Label(popup, text=f"Not counted: {titles}", foreground="gray", wraplength=860).pack(anchor="w", padx=10, pady=(0, 10))
+
     def export_shopping_list(self, grouped):
         filetypes = [("Text file", "*.txt"), ("PDF file", "*.pdf"), ("CSV file", "*.csv"), ("Excel file", "*.xlsx")]
         path = asksaveasfilename(defaultextension=".txt", filetypes=filetypes, title="Save Shopping List As")
@@ -224,28 +312,9 @@ class MealPlannerPanel:
         except Exception as e:
             tk.messagebox.showerror(self.app.tr("export_failed"), f"Could not export shopping list:\n{e}")
 
-    def simplify_ingredients(self, raw_items):
-        grouped = defaultdict(list)
-
-        unit_pattern = r'\b(\d+\/\d+|\d+\.\d+|\d+)\s*(cup|cups|tbsp|tsp|teaspoon|tablespoon|package|slice|pieces|oz|ml|g|kg|pound|lb|clove|dash|pinch|quart|liter|stick|can|pkg|bunch|handful|boxes)?\b'
-        descriptor_pattern = r'\b(chopped|sliced|minced|diced|fresh|optional|to taste|large|small|medium|extra|firm|soft|finely|roughly|thinly|ground|crushed|real|size|rinsed|cut|high grade|korean|baby|cooked|uncooked|prepared|regular|julienned|into 1inch cubes|available at asian markets)\b'
-
-        for item in raw_items:
-            original = item.strip()
-            cleaned = original.lower()
-            cleaned = re.sub(r'\(.*?\)', '', cleaned)                      # Remove parenthesis
-            cleaned = re.sub(unit_pattern, '', cleaned)                   # Remove measurements
-            cleaned = re.sub(descriptor_pattern, '', cleaned)            # Remove descriptors
-            cleaned = re.sub(r'[^\w\s]', '', cleaned)                    # Remove punctuation
-            cleaned = re.sub(r'\s+', ' ', cleaned).strip()               # Normalize spaces
-
-            # Apply normalization map (exact match or fallback to cleaned)
-            normalized = normalization_map.get(cleaned, cleaned)
-
-            grouped[normalized].append(original)
-
-        return dict(sorted(grouped.items()))
-
+    def aggregate_ingredients(self, items):
+        # One line per ingredient with quantities converted and summed
+        return aggregate_ingredients(items)
 
     def clear_planner(self):
         self.mealplan = []
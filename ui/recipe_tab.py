@@ -1,17 +1,18 @@
 #ui/recipe_tab.py
+import logging
 import tkinter as tk
 import webbrowser
-import requests
-from PIL import Image, ImageTk
-import io
-import json
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
 from services.nutrition_parse import parse_nutrition_summary
+from services.tools import detect_tools
 from components.scrollable_frame import ScrollableFrame
+from ui.images import get_image_loader
 from services.storage import save_favorites, get_favorites, save_mealplan, get_mealplan
 
+log = logging.getLogger(__name__)
+
 
 class RecipeTab:
     def __init__(self, app, notebook, basic_info, full_info, show_close=False):
@@ -19,6 +20,7 @@ class RecipeTab:
         self.full_info = full_info
         self.notebook = notebook
         self.tab = ScrollableFrame(notebook)
+        self._cancel_image = lambda: None
         notebook.add(self.tab, text=basic_info.get("title", "Recipe"))
 
 
@@ -43,19 +45,24 @@ class RecipeTab:
         img_frame = ttk.Frame(self.tab.scrollable_frame)
         img_frame.pack(pady=5)
 
-        if 'image' in self.full_info and self.full_info['image']:
-            try:
-                img_data = requests.get(self.full_info['image'], timeout=5).content
-                img = Image.open(io.BytesIO(img_data))
-                img.thumbnail((300, 300))
-                photo = ImageTk.PhotoImage(img)
-                img_label = ttk.Label(img_frame, image=photo)
-                img_label.image = photo
-                img_label.pack()
-            except Exception:
-                ttk.Label(img_frame, text=self.app.tr("no_image"), font=("Segoe UI", 10)).pack()
-        else:
+        if not self.full_info.get('image'):
             ttk.Label(img_frame, text=self.app.tr("no_image"), font=("Segoe UI", 10)).pack()
+            return
+
+        # placeholder until the loader hands the thumbnail back on the main loop
+        img_label = ttk.Label(img_frame, text=self.app.tr("loading"), font=("Segoe UI", 10))
+        img_label.pack()
+
+        def show(photo):
+            if not img_label.winfo_exists():
+                return
+            if photo is None:
+                img_label.configure(text=self.app.tr("no_image"))
+            else:
+                img_label.configure(image=photo, text="")
+                img_label.image = photo
+
+        self._cancel_image = get_image_loader(self.app.root).load(self.full_info['image'], show)
 
     def _add_meta(self):
         ready = self.full_info.get("readyInMinutes", "?")
@@ -99,18 +106,7 @@ class RecipeTab:
             text.pack(fill="both", expand=True, padx=5, pady=5)
 
     def _add_tools(self):
-        try:
-            with open("data/tools_map.json", "r", encoding="utf-8") as f:
-                tool_map = json.load(f)
-        except Exception:
-            return
-
-        content = (
-            self.full_info.get("summary", "") + " " +
-            " ".join(step["step"] for inst in self.full_info.get("analyzedInstructions", []) for step in inst.get("steps", []))
-        ).lower()
-
-        found_tools = {tool: url for tool, url in tool_map.items() if tool in content}
+        found_tools = detect_tools(self.full_info)
 
         if found_tools:
             ttk.Label(self.tab.scrollable_frame, text=self.app.tr("recommended_tools"), font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=5, pady=(10, 0))
@@ -128,7 +124,7 @@ class RecipeTab:
 
     def _add_nutrition_section(self):
         nutrition_data = self.full_info.get("nutrition", {})
-        print(f"[DEBUG] Nutrition for {self.full_info.get('title', 'Unknown')}:\n", nutrition_data)
+        log.debug("Nutrition for %s: %s", self.full_info.get("title", "Unknown"), nutrition_data)
 
         container = ttk.Frame(self.tab.scrollable_frame)
         container.pack(fill="x", padx=5, pady=5)
@@ -212,4 +208,5 @@ class RecipeTab:
         webbrowser.open(url)
 
     def close_tab(self):
+        self._cancel_image()
         self.notebook.forget(self.tab)
\ No newline at end of file
@@ -0,0 +1,122 @@
+#ui/tasks.py
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# ~60 fps: results are picked up within a frame, and an idle app doesn't poll at all
+POLL_MS = 16
+
+
+class Task:
+    """A service call running off the main thread. `cancel()` drops its callbacks."""
+
+    def __init__(self, on_done=None, on_error=None, owner=None):
+        self.on_done = on_done
+        self.on_error = on_error
+        self.owner = owner
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        if self._cancelled.is_set():
+            return True
+        # the widget that asked for this is gone: the user moved on
+        return self.owner is not None and not self.owner.winfo_exists()
+
+
+class TaskScheduler:
+    """
+    Runs blocking calls (network, disk) on a thread pool and hands the results
+    back to Tk callbacks on the main loop, which Tk requires.
+
+        scheduler.submit(get_recipe_info, rid, on_done=show, owner=placeholder)
+
+    A task is dropped when cancelled, when its owner widget is destroyed, or
+    when cancel_all() runs on navigation.
+    """
+
+    def __init__(self, root, max_workers=4, name="ui-tasks"):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._done = queue.Queue()
+        self._pending = set()
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None, owner=None):
+        """Must be called from the main thread."""
+        task = Task(on_done, on_error, owner)
+        self._pending.add(task)
+        task.future = self._executor.submit(self._run, task, fn, args)
+        # a future cancelled before it started never reaches _run; still let _poll forget it
+        task.future.add_done_callback(lambda f: f.cancelled() and self._done.put((task, None, None)))
+        self._ensure_polling()
+        return task
+
+    def cancel_all(self):
+        for task in list(self._pending):
+            task.cancel()
+
+    def _run(self, task, fn, args):
+        if task._cancelled.is_set():
+            self._done.put((task, None, None))
+            return
+        try:
+            self._done.put((task, fn(*args), None))
+        except Exception as e:
+            self._done.put((task, None, e))
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                task, result, error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if task not in self._pending:
+                continue
+            self._pending.discard(task)
+            if task.cancelled:
+                continue
+            try:
+                if error is not None:
+                    if task.on_error is None:
+                        log.error("Background task failed: %s", error, exc_info=error)
+                    else:
+                        task.on_error(error)
+                elif task.on_done is not None:
+                    task.on_done(result)
+            except Exception:
+                log.exception("Task callback failed")
+
+        if self._pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_scheduler = None
+
+
+def get_scheduler(root):
+    """The scheduler shared by every panel of this Tk app."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TaskScheduler(root)
+    return _scheduler
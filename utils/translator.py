@@ -1,6 +1,15 @@
 #utils/translator.py
 import json
+import logging
 import os
+import threading
+import time
+from types import MappingProxyType
+
+log = logging.getLogger(__name__)
+
+LANG_DIR = "lang"
+
 
 class Translator:
     def __init__(self, language="en"):
@@ -10,7 +19,7 @@ class Translator:
 
     def load_language(self, language):
         self.language = language
-        path = os.path.join("lang", f"{language}.json")
+        path = os.path.join(LANG_DIR, f"{language}.json")
         if os.path.exists(path):
             with open(path, "r", encoding="utf-8") as f:
                 self.translations = json.load(f)
@@ -19,3 +28,60 @@ class Translator:
 
     def _(self, key):
         return self.translations.get(key, key)
+
+
+class TranslationCatalog:
+    """
+    All language files loaded once into read-only mappings, safe to share
+    between threads. With `hot_reload` on, reload_changed() picks up edited
+    files by mtime (checked at most once per `check_interval` seconds).
+    """
+
+    def __init__(self, languages, lang_dir=LANG_DIR, default="en", hot_reload=False, check_interval=1.0):
+        self.languages = list(languages)
+        self.lang_dir = lang_dir
+        self.default = default
+        self.hot_reload = hot_reload
+        self.check_interval = check_interval
+        self._catalogs = {}
+        self._mtimes = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        for language in self.languages:
+            self._load(language)
+
+    def _path(self, language):
+        return os.path.join(self.lang_dir, f"{language}.json")
+
+    def _load(self, language):
+        path = self._path(language)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Could not load translations for %r: %s", language, e)
+            mtime, data = None, {}
+        # swap in a new mapping instead of mutating the one readers may hold
+        catalogs = dict(self._catalogs)
+        catalogs[language] = MappingProxyType(data)
+        self._catalogs = catalogs
+        self._mtimes[language] = mtime
+
+    def reload_changed(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            for language in self.languages:
+                try:
+                    mtime = os.path.getmtime(self._path(language))
+                except OSError:
+                    mtime = None
+                if mtime != self._mtimes.get(language):
+                    self._load(language)
+
+    def get(self, language):
+        catalogs = self._catalogs
+        return catalogs.get(language) or catalogs.get(self.default) or MappingProxyType({})